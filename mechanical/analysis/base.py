@@ -1,17 +1,158 @@
+"""Contrato das análises e execução conjunta das análises ativas.
+
+Cada análise declara o que lê e o que desenha:
+
+- `LANDMARKS`: landmarks lidos diretamente do array em pixels;
+- `SIGNALS`: sinais derivados (chaves de SIGNALS, ex.: ponto médio dos quadris),
+  recebidos prontos em `process_frame`;
+- `OVERLAY_POINTS` e `OVERLAY_LINES`: pontos marcados e ligações entre eles
+  (landmarks ou sinais), e `OVERLAY_GUIDES`: linhas verticais ou horizontais
+  que passam por um sinal.
+
+O AnalysisSet junta as declarações das análises ativas: a cada frame converte
+para pixels só os landmarks que alguma delas usa, calcula cada sinal uma única
+vez e desenha pontos e ligações uma única vez, sem repetir os comuns.
+"""
 from abc import ABC, abstractmethod
 
+import cv2
+import numpy as np
+
+from pose import PoseLandmark, landmarks_to_pixels
+
+# Estilo do desenho: pontos, ligações e linhas-guia
+POINT_COLOR = (0, 0, 255)
+LINE_COLOR = (0, 255, 0)
+GUIDE_COLOR = (255, 0, 0)
+
+
+def midpoint_signal(left, right):
+    """Sinal do ponto médio (x, y) entre dois landmarks."""
+    return (left, right), lambda landmarks: (landmarks[left, :2] + landmarks[right, :2]) / 2
+
+
+FEET = (PoseLandmark.LEFT_HEEL, PoseLandmark.RIGHT_HEEL, PoseLandmark.LEFT_FOOT_INDEX, PoseLandmark.RIGHT_FOOT_INDEX)
+
+# Sinais derivados: nome -> (landmarks de que depende, função sobre o array em pixels)
+SIGNALS = {
+    "head_midpoint": midpoint_signal(PoseLandmark.LEFT_EAR, PoseLandmark.RIGHT_EAR),
+    "shoulder_midpoint": midpoint_signal(PoseLandmark.LEFT_SHOULDER, PoseLandmark.RIGHT_SHOULDER),
+    "hip_midpoint": midpoint_signal(PoseLandmark.LEFT_HIP, PoseLandmark.RIGHT_HIP),
+    "knee_midpoint": midpoint_signal(PoseLandmark.LEFT_KNEE, PoseLandmark.RIGHT_KNEE),
+    "ankle_midpoint": midpoint_signal(PoseLandmark.LEFT_ANKLE, PoseLandmark.RIGHT_ANKLE),
+    # Linha do solo: o ponto mais baixo (maior y) dos calcanhares e das pontas dos pés
+    "ground_y": (FEET, lambda landmarks: landmarks[list(FEET), 1].max()),
+}
+
+
 class AnalysisBase(ABC):
+    """Análise executada frame a frame pela interface, pelo pipeline e pelo modo em lote."""
+
+    # Prefixo e campos (nome, dtype) exportados por frame
+    EXPORT_NAME = None
+    EXPORT_FIELDS = ()
+    LANDMARKS = ()
+    SIGNALS = ()
+    OVERLAY_POINTS = ()
+    OVERLAY_LINES = ()
+    # (sinal, "vertical" ou "horizontal")
+    OVERLAY_GUIDES = ()
+
+    # Marcado em process_frame quando os painéis precisam ser redesenhados
+    dirty = False
+
     @abstractmethod
-    def setup(self, parent_layout):
-        """Set up analysis-specific UI components."""
-        pass
+    def setup_ui(self):
+        """Cria os painéis da análise no layout recebido."""
 
     @abstractmethod
-    def process(self, annotated_frame, results):
-        """Process each frame for the analysis."""
-        pass
+    def process_frame(self, annotated_frame, landmarks, timestamp_ms, signals):
+        """Processa um frame com detecção.
+
+        `landmarks` é o array (33, 4) em pixels, com os landmarks declarados (as
+        demais linhas podem ser NaN), e `signals` traz os sinais declarados.
+        """
+
+    @abstractmethod
+    def update_ui(self):
+        """Redesenha os painéis com os valores atuais."""
+
+    @abstractmethod
+    def export_record(self):
+        """Valores do último frame, na ordem de EXPORT_FIELDS."""
+
+    @abstractmethod
+    def get_results(self):
+        """Métricas de toda a sessão, serializáveis em JSON."""
 
     @abstractmethod
     def reset(self):
-        """Reset analysis-specific variables."""
-        pass
+        """Volta ao estado inicial, para uma nova sessão."""
+
+
+class AnalysisSet:
+    """Executa as análises ativas de uma sessão sobre o resultado do Pose de cada frame.
+
+    Só as análises recebidas contam: landmarks e sinais usados apenas por
+    análises desligadas não são convertidos nem calculados.
+    """
+
+    def __init__(self, analyses):
+        self.analyses = list(analyses)
+        self.signals = list(dict.fromkeys(name for analysis in self.analyses for name in analysis.SIGNALS))
+        required = {int(index) for analysis in self.analyses for index in analysis.LANDMARKS}
+        for name in self.signals:
+            required.update(int(index) for index in SIGNALS[name][0])
+        self.landmark_indexes = sorted(required)
+
+        # Desenho de todas as análises, sem repetições
+        self.guides = list(dict.fromkeys(guide for analysis in self.analyses for guide in analysis.OVERLAY_GUIDES))
+        self.points = list(dict.fromkeys(point for analysis in self.analyses for point in analysis.OVERLAY_POINTS))
+        lines = {}
+        for analysis in self.analyses:
+            for start, end in analysis.OVERLAY_LINES:
+                lines.setdefault(frozenset((start, end)), (start, end))
+        self.lines = list(lines.values())
+        self.positions = list(dict.fromkeys(self.points + [point for line in self.lines for point in line]))
+
+    def __iter__(self):
+        return iter(self.analyses)
+
+    def __len__(self):
+        return len(self.analyses)
+
+    def process(self, annotated_frame, results, timestamp_ms):
+        """Converte os landmarks pedidos e executa as análises; retorna o array em pixels, ou None sem detecção."""
+        landmarks = landmarks_to_pixels(results, annotated_frame.shape[1], annotated_frame.shape[0],
+                                        self.landmark_indexes)
+        if landmarks is not None:
+            self.process_landmarks(annotated_frame, landmarks, timestamp_ms)
+        return landmarks
+
+    def process_landmarks(self, annotated_frame, landmarks, timestamp_ms):
+        """Calcula os sinais, desenha o que as análises declararam e chama o process_frame de cada uma."""
+        signals = {name: SIGNALS[name][1](landmarks) for name in self.signals}
+        self.draw(annotated_frame, landmarks, signals)
+        for analysis in self.analyses:
+            analysis.process_frame(annotated_frame, landmarks, timestamp_ms, signals)
+
+    def draw(self, annotated_frame, landmarks, signals):
+        height, width = annotated_frame.shape[:2]
+        for name, orientation in self.guides:
+            value = signals[name]
+            if orientation == "vertical":
+                x = int(value if np.ndim(value) == 0 else value[0])
+                cv2.line(annotated_frame, (x, 0), (x, height), GUIDE_COLOR, 2)
+            else:
+                y = int(value if np.ndim(value) == 0 else value[1])
+                cv2.line(annotated_frame, (0, y), (width, y), GUIDE_COLOR, 2)
+
+        # Posição em pixels inteiros de cada ponto: landmark (índice) ou sinal (nome)
+        positions = {}
+        for point in self.positions:
+            x, y = signals[point] if isinstance(point, str) else landmarks[point, :2]
+            positions[point] = (int(x), int(y))
+        for point in self.points:
+            cv2.circle(annotated_frame, positions[point], 5, POINT_COLOR, -1)
+        for start, end in self.lines:
+            cv2.line(annotated_frame, positions[start], positions[end], LINE_COLOR, 2)
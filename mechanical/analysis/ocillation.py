@@ -1,29 +1,63 @@
-from PyQt5.QtWidgets import QVBoxLayout, QGroupBox, QSizePolicy
+from PyQt5.QtWidgets import QVBoxLayout, QGroupBox, QSizePolicy, QCheckBox
 import pyqtgraph as pg
 import cv2
+import numpy as np
+from analysis.base import AnalysisBase
+from history import TieredHistory, envelope
+from pose import PoseLandmark
+from utils import RunningStats
+from refresh import configure_fast_plot, expand_y_range
+
+
+# Séries acompanhadas, na ordem das linhas do buffer de deslocamentos
+SERIES = ("head_x", "head_y", "left_shoulder_x", "right_shoulder_x", "left_hip_x", "right_hip_x")
+
+
+class OscillationAnalysis(AnalysisBase):
+    # Campos exportados por frame: deslocamentos (px) de cada série, NaN enquanto os pontos zero são capturados
+    EXPORT_NAME = "oscillation"
+    EXPORT_FIELDS = tuple((name, "float32") for name in SERIES)
+
+    LANDMARKS = (
+        PoseLandmark.NOSE, PoseLandmark.LEFT_SHOULDER, PoseLandmark.RIGHT_SHOULDER,
+        PoseLandmark.LEFT_HIP, PoseLandmark.RIGHT_HIP,
+    )
+    # Pontos marcados no frame e as linhas que os ligam
+    OVERLAY_POINTS = LANDMARKS
+    OVERLAY_LINES = (
+        (PoseLandmark.NOSE, PoseLandmark.LEFT_SHOULDER),
+        (PoseLandmark.NOSE, PoseLandmark.RIGHT_SHOULDER),
+        (PoseLandmark.LEFT_SHOULDER, PoseLandmark.RIGHT_SHOULDER),
+        (PoseLandmark.LEFT_SHOULDER, PoseLandmark.LEFT_HIP),
+        (PoseLandmark.RIGHT_SHOULDER, PoseLandmark.RIGHT_HIP),
+        (PoseLandmark.LEFT_HIP, PoseLandmark.RIGHT_HIP),
+    )
 
-
-class OscillationAnalysis:
     def __init__(self, parent_layout, mp_pose, max_points=100, initial_frames=30):
         self.parent_layout = parent_layout
         self.mp_pose = mp_pose
         self.max_points = max_points
         self.initial_frames = initial_frames
 
-        # Inicializa variáveis específicas da análise
-        self.zero_point_head_x = None
-        self.zero_point_head_y = None
-        self.zero_point_left_shoulder_x = None
-        self.zero_point_right_shoulder_x = None
-        self.zero_point_left_hip_x = None
-        self.zero_point_right_hip_x = None
-        self.displacements_head_x = []
-        self.displacements_head_y = []
-        self.displacements_left_shoulder = []
-        self.displacements_right_shoulder = []
-        self.displacements_left_hip = []
-        self.displacements_right_hip = []
+        landmark = mp_pose.PoseLandmark
+        # Landmark e coordenada (0 = x, 1 = y) de cada série, na ordem de SERIES
+        self.series_landmarks = np.array([
+            landmark.NOSE, landmark.NOSE, landmark.LEFT_SHOULDER, landmark.RIGHT_SHOULDER,
+            landmark.LEFT_HIP, landmark.RIGHT_HIP,
+        ])
+        self.series_axes = np.array([0, 1, 0, 0, 0, 0])
+
+        # Posição média de cada série nos frames iniciais
+        self.zero_points = None
+        # Deslocamentos da sessão inteira, uma linha por série, com memória fixa: os últimos
+        # completos (a janela de max_points vem daqui) e os mais antigos em blocos de mínimo/máximo/média
+        self.history = TieredHistory(len(SERIES))
+        self.last_deltas = np.full(len(SERIES), np.nan)
         self.frames_captured = 0
+        self.dirty = False
+
+        # Estatísticas de toda a sessão (não limitadas a max_points)
+        self.stats = {name: RunningStats() for name in SERIES}
 
         # Inicializar PlotDataItems
         self.head_x_curve = None
@@ -32,6 +66,7 @@ class OscillationAnalysis:
         self.right_shoulder_curve = None
         self.left_hip_curve = None
         self.right_hip_curve = None
+        self.session_checkbox = None
 
     def setup_ui(self):
         """Configura os componentes da UI para a análise de oscilação."""
@@ -79,132 +114,106 @@ class OscillationAnalysis:
         self.hips_movement_group.setLayout(hips_movement_layout)
     
 
+        # Eixo X fixo na janela de max_points; eixo Y só é ampliado quando necessário
+        self.plot_widgets = (self.plot_widget_head_x, self.plot_widget_head_y,
+                             self.plot_widget_shoulders, self.plot_widget_hips)
+        for plot_widget in self.plot_widgets:
+            configure_fast_plot(plot_widget, x_range=(0, self.max_points), y_range=(-20, 20))
+        # Curvas na ordem de SERIES
+        self.curves = (self.head_x_curve, self.head_y_curve, self.left_shoulder_curve, self.right_shoulder_curve,
+                       self.left_hip_curve, self.right_hip_curve)
+
+        # Sessão inteira: faixa de deslocamento ao longo do tempo, em vez da janela recente
+        self.session_checkbox = QCheckBox("Sessão inteira")
+        self.session_checkbox.toggled.connect(self.on_session_toggled)
+
         # Adicionar grupos ao layout principal
+        self.parent_layout.addWidget(self.session_checkbox)
         self.parent_layout.addWidget(self.head_movement_group)
         self.parent_layout.addWidget(self.shoulders_movement_group)
         self.parent_layout.addWidget(self.hips_movement_group)
 
-    def process_frame(self, annotated_frame, results):
-        """Processa cada frame para a análise de oscilação corporal."""
-        landmark_indices = [
-            self.mp_pose.PoseLandmark.NOSE,
-            self.mp_pose.PoseLandmark.LEFT_SHOULDER,
-            self.mp_pose.PoseLandmark.RIGHT_SHOULDER,
-            self.mp_pose.PoseLandmark.LEFT_HIP,
-            self.mp_pose.PoseLandmark.RIGHT_HIP,
-        ]
-
-        pose_connections = [
-            (self.mp_pose.PoseLandmark.NOSE, self.mp_pose.PoseLandmark.LEFT_SHOULDER),
-            (self.mp_pose.PoseLandmark.NOSE, self.mp_pose.PoseLandmark.RIGHT_SHOULDER),
-            (self.mp_pose.PoseLandmark.LEFT_SHOULDER, self.mp_pose.PoseLandmark.RIGHT_SHOULDER),
-            (self.mp_pose.PoseLandmark.LEFT_SHOULDER, self.mp_pose.PoseLandmark.LEFT_HIP),
-            (self.mp_pose.PoseLandmark.RIGHT_SHOULDER, self.mp_pose.PoseLandmark.RIGHT_HIP),
-            (self.mp_pose.PoseLandmark.LEFT_HIP, self.mp_pose.PoseLandmark.RIGHT_HIP),
-        ]
-
-        # Marcar os pontos chave
-        for idx in landmark_indices:
-            landmark = results.pose_landmarks.landmark[idx]
-            x = int(landmark.x * annotated_frame.shape[1])
-            y = int(landmark.y * annotated_frame.shape[0])
-            cv2.circle(annotated_frame, (x, y), 5, (0, 0, 255), -1)
-
-        # Conectar os pontos com linhas
-        for connection in pose_connections:
-            start_idx = connection[0]
-            end_idx = connection[1]
-            start_landmark = results.pose_landmarks.landmark[start_idx]
-            end_landmark = results.pose_landmarks.landmark[end_idx]
-            x_start = int(start_landmark.x * annotated_frame.shape[1])
-            y_start = int(start_landmark.y * annotated_frame.shape[0])
-            x_end = int(end_landmark.x * annotated_frame.shape[1])
-            y_end = int(end_landmark.y * annotated_frame.shape[0])
-            cv2.line(annotated_frame, (x_start, y_start), (x_end, y_end), (0, 255, 0), 2)
-
-        # Obter coordenadas
-        nose_landmark = results.pose_landmarks.landmark[self.mp_pose.PoseLandmark.NOSE]
-        left_shoulder_landmark = results.pose_landmarks.landmark[self.mp_pose.PoseLandmark.LEFT_SHOULDER]
-        right_shoulder_landmark = results.pose_landmarks.landmark[self.mp_pose.PoseLandmark.RIGHT_SHOULDER]
-        left_hip_landmark = results.pose_landmarks.landmark[self.mp_pose.PoseLandmark.LEFT_HIP]
-        right_hip_landmark = results.pose_landmarks.landmark[self.mp_pose.PoseLandmark.RIGHT_HIP]
-
-        nose_x = nose_landmark.x * annotated_frame.shape[1]
-        nose_y = nose_landmark.y * annotated_frame.shape[0]
-        left_shoulder_x = left_shoulder_landmark.x * annotated_frame.shape[1]
-        right_shoulder_x = right_shoulder_landmark.x * annotated_frame.shape[1]
-        left_hip_x = left_hip_landmark.x * annotated_frame.shape[1]
-        right_hip_x = right_hip_landmark.x * annotated_frame.shape[1]
+    def process_frame(self, annotated_frame, landmarks, timestamp_ms, signals):
+        """Processa cada frame para a análise de oscilação corporal.
+
+        `landmarks` é o array (33, 4) em pixels compartilhado entre as análises;
+        os pontos e as ligações já foram desenhados pelo AnalysisSet.
+        """
+        # Coordenadas de todas as séries de uma vez
+        values = landmarks[self.series_landmarks, self.series_axes].astype(np.float64)
 
         if self.frames_captured < self.initial_frames:
-            if self.zero_point_head_x is None:
-                self.zero_point_head_x = nose_x
-                self.zero_point_head_y = nose_y
-                self.zero_point_left_shoulder_x = left_shoulder_x
-                self.zero_point_right_shoulder_x = right_shoulder_x
-                self.zero_point_left_hip_x = left_hip_x
-                self.zero_point_right_hip_x = right_hip_x
+            if self.zero_points is None:
+                self.zero_points = values
             else:
-                self.zero_point_head_x = (self.zero_point_head_x * self.frames_captured + nose_x) / (self.frames_captured + 1)
-                self.zero_point_head_y = (self.zero_point_head_y * self.frames_captured + nose_y) / (self.frames_captured + 1)
-                self.zero_point_left_shoulder_x = (self.zero_point_left_shoulder_x * self.frames_captured + left_shoulder_x) / (self.frames_captured + 1)
-                self.zero_point_right_shoulder_x = (self.zero_point_right_shoulder_x * self.frames_captured + right_shoulder_x) / (self.frames_captured + 1)
-                self.zero_point_left_hip_x = (self.zero_point_left_hip_x * self.frames_captured + left_hip_x) / (self.frames_captured + 1)
-                self.zero_point_right_hip_x = (self.zero_point_right_hip_x * self.frames_captured + right_hip_x) / (self.frames_captured + 1)
+                # Média incremental dos frames iniciais
+                self.zero_points += (values - self.zero_points) / (self.frames_captured + 1)
             self.frames_captured += 1
+            self.last_deltas = np.full(len(SERIES), np.nan)
             cv2.putText(annotated_frame, f'Capturando pontos zero... ({self.frames_captured}/{self.initial_frames})', (10, 30),
                         cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
         else:
-            delta_head_x = nose_x - self.zero_point_head_x
-            delta_head_y = nose_y - self.zero_point_head_y
-            delta_left_shoulder_x = left_shoulder_x - self.zero_point_left_shoulder_x
-            delta_right_shoulder_x = right_shoulder_x - self.zero_point_right_shoulder_x
-            delta_left_hip_x = left_hip_x - self.zero_point_left_hip_x
-            delta_right_hip_x = right_hip_x - self.zero_point_right_hip_x
-
-            self.displacements_head_x.append(delta_head_x)
-            self.displacements_head_y.append(delta_head_y)
-            self.displacements_left_shoulder.append(delta_left_shoulder_x)
-            self.displacements_right_shoulder.append(delta_right_shoulder_x)
-            self.displacements_left_hip.append(delta_left_hip_x)
-            self.displacements_right_hip.append(delta_right_hip_x)
-
-            if len(self.displacements_head_x) > self.max_points:
-                self.displacements_head_x = self.displacements_head_x[-self.max_points:]
-                self.displacements_head_y = self.displacements_head_y[-self.max_points:]
-                self.displacements_left_shoulder = self.displacements_left_shoulder[-self.max_points:]
-                self.displacements_right_shoulder = self.displacements_right_shoulder[-self.max_points:]
-                self.displacements_left_hip = self.displacements_left_hip[-self.max_points:]
-                self.displacements_right_hip = self.displacements_right_hip[-self.max_points:]
-
-            # Atualizar gráficos usando setData
-            self.head_x_curve.setData(self.displacements_head_x)
-            self.head_y_curve.setData(self.displacements_head_y)
-            self.left_shoulder_curve.setData(self.displacements_left_shoulder)
-            self.right_shoulder_curve.setData(self.displacements_right_shoulder)
-            self.left_hip_curve.setData(self.displacements_left_hip)
-            self.right_hip_curve.setData(self.displacements_right_hip)
+            deltas = values - self.zero_points
+            self.last_deltas = deltas
+            self.history.append(timestamp_ms, deltas)
+            for name, delta in zip(SERIES, deltas.tolist()):
+                self.stats[name].add(delta)
+            self.dirty = True
+
+    def update_ui(self):
+        """Atualiza os gráficos com os últimos max_points deslocamentos (cópia lida sob o lock do histórico).
+
+        Com `Sessão inteira`, mostra a faixa (mínimo e máximo) de cada série desde
+        o início da sessão, em segundos.
+        """
+        if len(self.history) == 0:
+            return
+        if self.session_checkbox.isChecked():
+            times, _, minimums, maximums = self.history.window()
+            seconds = (times - self.history.first_ms) / 1000
+            points = [envelope(seconds, low, high) for low, high in zip(minimums, maximums)]
+            for plot_widget in self.plot_widgets:
+                plot_widget.setXRange(0, max(seconds[-1], 1), padding=0)
+        else:
+            _, displacements = self.history.last(self.max_points)
+            minimums = maximums = displacements
+            points = [(series,) for series in displacements]
+        for curve, data in zip(self.curves, points):
+            curve.setData(*data)
+
+        expand_y_range(self.plot_widget_head_x, minimums[0].min(), maximums[0].max())
+        expand_y_range(self.plot_widget_head_y, minimums[1].min(), maximums[1].max())
+        expand_y_range(self.plot_widget_shoulders, minimums[2:4].min(), maximums[2:4].max())
+        expand_y_range(self.plot_widget_hips, minimums[4:6].min(), maximums[4:6].max())
+
+    def on_session_toggled(self, checked):
+        if not checked:
+            for plot_widget in self.plot_widgets:
+                plot_widget.setXRange(0, self.max_points, padding=0)
+        self.dirty = True
+
+    def export_record(self):
+        """Valores do último frame, na ordem de EXPORT_FIELDS."""
+        return self.last_deltas
+
+    def get_results(self):
+        """Retorna as estatísticas de deslocamento (em pixels) de toda a sessão."""
+        return {name: stats.summary() for name, stats in self.stats.items()}
 
     def reset(self):
         """Reseta as variáveis específicas da análise de oscilação corporal."""
-        self.zero_point_head_x = None
-        self.zero_point_head_y = None
-        self.zero_point_left_shoulder_x = None
-        self.zero_point_right_shoulder_x = None
-        self.zero_point_left_hip_x = None
-        self.zero_point_right_hip_x = None
-        self.displacements_head_x.clear()
-        self.displacements_head_y.clear()
-        self.displacements_left_shoulder.clear()
-        self.displacements_right_shoulder.clear()
-        self.displacements_left_hip.clear()
-        self.displacements_right_hip.clear()
+        self.zero_points = None
+        self.history.clear()
+        self.last_deltas = np.full(len(SERIES), np.nan)
         self.frames_captured = 0
+        for stats in self.stats.values():
+            stats.reset()
 
         # Limpar os dados dos gráficos
-        self.head_x_curve.clear()
-        self.head_y_curve.clear()
-        self.left_shoulder_curve.clear()
-        self.right_shoulder_curve.clear()
-        self.left_hip_curve.clear()
-        self.right_hip_curve.clear()
+        if self.head_x_curve is not None:
+            self.head_x_curve.clear()
+            self.head_y_curve.clear()
+            self.left_shoulder_curve.clear()
+            self.right_shoulder_curve.clear()
+            self.left_hip_curve.clear()
+            self.right_hip_curve.clear()
@@ -1,15 +1,46 @@
 from PyQt5.QtWidgets import QLabel, QVBoxLayout, QGroupBox
 from PyQt5.QtCore import Qt
-from utils import calculate_angle
-import cv2
+from utils import calculate_angle, RunningStats
+from analysis.base import AnalysisBase
+import numpy as np
+
+class PostureAnalysis(AnalysisBase):
+    # Campos exportados por frame: ângulos (graus) em relação à linha zero
+    EXPORT_NAME = "posture"
+    EXPORT_FIELDS = (
+        ("head_angle", "float32"), ("shoulder_angle", "float32"), ("hip_angle", "float32"), ("knee_angle", "float32"),
+    )
+
+    # Ponto médio de cada par esquerdo/direito: cabeça, ombros, quadris, joelhos e tornozelos (pés)
+    SIGNALS = ("head_midpoint", "shoulder_midpoint", "hip_midpoint", "knee_midpoint", "ankle_midpoint")
+    # Linha zero dinâmica no tornozelo e a postura do atleta, da cabeça aos joelhos
+    OVERLAY_GUIDES = (("ankle_midpoint", "vertical"),)
+    OVERLAY_POINTS = SIGNALS[:4]
+    OVERLAY_LINES = (
+        ("head_midpoint", "shoulder_midpoint"),
+        ("shoulder_midpoint", "hip_midpoint"),
+        ("hip_midpoint", "knee_midpoint"),
+    )
 
-class PostureAnalysis:
     def __init__(self, parent_layout, mp_pose, max_points=100, initial_frames=30):
         self.parent_layout = parent_layout
         self.mp_pose = mp_pose
         self.max_points = max_points  # Not used but included for compatibility
         self.initial_frames = initial_frames  # Not used but included for compatibility
 
+        # Ângulos do último frame e estatísticas da sessão
+        self.head_angle = 0.0
+        self.shoulder_angle = 0.0
+        self.hip_angle = 0.0
+        self.knee_angle = 0.0
+        self.dirty = False
+        self.stats = {
+            "head_angle": RunningStats(),
+            "shoulder_angle": RunningStats(),
+            "hip_angle": RunningStats(),
+            "knee_angle": RunningStats(),
+        }
+
         # Labels para os ângulos
         self.head_angle_label = None
         self.shoulder_angle_label = None
@@ -96,88 +127,51 @@ class PostureAnalysis:
         self.parent_layout.addWidget(self.hip_group)
         self.parent_layout.addWidget(self.knee_group)
 
-    def process_frame(self, annotated_frame, results):
-        """Processa cada frame para a análise postural."""
-        if not results.pose_landmarks:
-            return
-
-        landmarks = results.pose_landmarks.landmark
-
-        image_height, image_width, _ = annotated_frame.shape
-
-        # Obter coordenadas dos pontos
-        try:
-            # Cabeça
-            left_ear = landmarks[self.mp_pose.PoseLandmark.LEFT_EAR.value]
-            right_ear = landmarks[self.mp_pose.PoseLandmark.RIGHT_EAR.value]
-            head_x = int((left_ear.x + right_ear.x) / 2 * image_width)
-            head_y = int((left_ear.y + right_ear.y) / 2 * image_height)
-
-            # Ombros
-            left_shoulder = landmarks[self.mp_pose.PoseLandmark.LEFT_SHOULDER.value]
-            right_shoulder = landmarks[self.mp_pose.PoseLandmark.RIGHT_SHOULDER.value]
-            shoulder_x = int((left_shoulder.x + right_shoulder.x) / 2 * image_width)
-            shoulder_y = int((left_shoulder.y + right_shoulder.y) / 2 * image_height)
-
-            # Quadris
-            left_hip = landmarks[self.mp_pose.PoseLandmark.LEFT_HIP.value]
-            right_hip = landmarks[self.mp_pose.PoseLandmark.RIGHT_HIP.value]
-            hip_x = int((left_hip.x + right_hip.x) / 2 * image_width)
-            hip_y = int((left_hip.y + right_hip.y) / 2 * image_height)
-
-            # Joelhos
-            left_knee = landmarks[self.mp_pose.PoseLandmark.LEFT_KNEE.value]
-            right_knee = landmarks[self.mp_pose.PoseLandmark.RIGHT_KNEE.value]
-            knee_x = int((left_knee.x + right_knee.x) / 2 * image_width)
-            knee_y = int((left_knee.y + right_knee.y) / 2 * image_height)
-
-            # Tornozelos (pés)
-            left_ankle = landmarks[self.mp_pose.PoseLandmark.LEFT_ANKLE.value]
-            right_ankle = landmarks[self.mp_pose.PoseLandmark.RIGHT_ANKLE.value]
-            ankle_x = int((left_ankle.x + right_ankle.x) / 2 * image_width)
-            ankle_y = int((left_ankle.y + right_ankle.y) / 2 * image_height)
-        except IndexError:
-            # Caso algum landmark não esteja disponível
-            return
-
-        points = [
-            (head_x, head_y),
-            (shoulder_x, shoulder_y),
-            (hip_x, hip_y),
-            (knee_x, knee_y)
-        ]
+    def process_frame(self, annotated_frame, landmarks, timestamp_ms, signals):
+        """Processa cada frame para a análise postural.
+
+        Usa os pontos médios de `signals`, calculados uma vez por frame pelo
+        AnalysisSet, que também desenha a linha zero e a postura.
+        """
+        # Ponto médio de cada par: cabeça, ombros, quadris, joelhos e tornozelos (pés)
+        midpoints = np.array([signals[name] for name in self.SIGNALS]).astype(np.int32)
 
         # Definir zero_line_x e reference_y usando o tornozelo (pé)
-        zero_line_x = ankle_x
-        reference_y = ankle_y
+        zero_line_x, reference_y = midpoints[4].tolist()
 
         # Calcular ângulos relativos à linha zero dinâmica
-        head_angle = calculate_angle(head_x, head_y, zero_line_x, reference_y)
-        shoulder_angle = calculate_angle(shoulder_x, shoulder_y, zero_line_x, reference_y)
-        hip_angle = calculate_angle(hip_x, hip_y, zero_line_x, reference_y)
-        knee_angle = calculate_angle(knee_x, knee_y, zero_line_x, reference_y)
-
-        # Atualizar labels na interface
-        self.head_angle_label.setText(f"Ângulo da Cabeça: {head_angle:.1f}°")
-        self.shoulder_angle_label.setText(f"Ângulo do Ombro: {shoulder_angle:.1f}°")
-        self.hip_angle_label.setText(f"Ângulo do Quadril: {hip_angle:.1f}°")
-        self.knee_angle_label.setText(f"Ângulo do Joelho: {knee_angle:.1f}°")
-
-        # Desenhar a linha zero dinâmica na imagem
-        cv2.line(annotated_frame, (zero_line_x, 0), (zero_line_x, image_height), (255, 0, 0), 2)
-
-        # Marcar os pontos no corpo do atleta
-        for x, y in points:
-            cv2.circle(annotated_frame, (x, y), 5, (0, 0, 255), -1)
-
-        # Conectar os pontos formando uma linha reta na postura do atleta
-        cv2.line(annotated_frame, points[0], points[1], (0, 255, 0), 2)  # Cabeça aos Ombros
-        cv2.line(annotated_frame, points[1], points[2], (0, 255, 0), 2)  # Ombros aos Quadris
-        cv2.line(annotated_frame, points[2], points[3], (0, 255, 0), 2)  # Quadris aos Joelhos
+        angles = calculate_angle(midpoints[:4, 0], midpoints[:4, 1], zero_line_x, reference_y)
+        self.head_angle, self.shoulder_angle, self.hip_angle, self.knee_angle = angles.tolist()
+
+        self.stats["head_angle"].add(self.head_angle)
+        self.stats["shoulder_angle"].add(self.shoulder_angle)
+        self.stats["hip_angle"].add(self.hip_angle)
+        self.stats["knee_angle"].add(self.knee_angle)
+        self.dirty = True
+
+    def update_ui(self):
+        """Atualiza os labels com os ângulos atuais."""
+        self.head_angle_label.setText(f"Ângulo da Cabeça: {self.head_angle:.1f}°")
+        self.shoulder_angle_label.setText(f"Ângulo do Ombro: {self.shoulder_angle:.1f}°")
+        self.hip_angle_label.setText(f"Ângulo do Quadril: {self.hip_angle:.1f}°")
+        self.knee_angle_label.setText(f"Ângulo do Joelho: {self.knee_angle:.1f}°")
+
+    def export_record(self):
+        """Valores do último frame, na ordem de EXPORT_FIELDS."""
+        return self.head_angle, self.shoulder_angle, self.hip_angle, self.knee_angle
+
+    def get_results(self):
+        """Retorna as estatísticas dos ângulos (em graus) de toda a sessão."""
+        return {name: stats.summary() for name, stats in self.stats.items()}
 
     def reset(self):
         """Reseta as variáveis específicas da análise postural."""
-        self.head_angle_label.setText("Ângulo da Cabeça: 0.0°")
-        self.shoulder_angle_label.setText("Ângulo do Ombro: 0.0°")
-        self.hip_angle_label.setText("Ângulo do Quadril: 0.0°")
-        self.knee_angle_label.setText("Ângulo do Joelho: 0.0°")
+        self.head_angle = 0.0
+        self.shoulder_angle = 0.0
+        self.hip_angle = 0.0
+        self.knee_angle = 0.0
+        for stats in self.stats.values():
+            stats.reset()
+
+        if self.head_angle_label is not None:
+            self.update_ui()
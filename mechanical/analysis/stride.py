@@ -1,18 +1,51 @@
-import cv2
-import time
 from collections import deque
-from PyQt5.QtWidgets import QLabel, QVBoxLayout, QGroupBox, QLineEdit, QHBoxLayout
+from PyQt5.QtWidgets import QLabel, QVBoxLayout, QGroupBox, QLineEdit, QHBoxLayout, QCheckBox
 from PyQt5.QtCore import Qt
 import numpy as np
 import pyqtgraph as pg
-
-
-class StrideAnalysis:
-    def __init__(self, parent_layout, mp_pose, max_points=100, initial_frames=30):
+from analysis.base import AnalysisBase
+from history import TieredHistory
+from pose import PoseLandmark
+from refresh import configure_fast_plot
+
+
+# Cor de cada tipo de pisada no gráfico
+STRIKE_COLORS = {1: 'b', 2: 'g', 3: 'r'}
+
+# Pontos de cada perna (esquerda, direita) na ordem em que são ligados:
+# quadril, joelho, tornozelo, calcanhar e ponta do pé
+LEGS = (
+    (PoseLandmark.LEFT_HIP, PoseLandmark.LEFT_KNEE, PoseLandmark.LEFT_ANKLE, PoseLandmark.LEFT_HEEL,
+     PoseLandmark.LEFT_FOOT_INDEX),
+    (PoseLandmark.RIGHT_HIP, PoseLandmark.RIGHT_KNEE, PoseLandmark.RIGHT_ANKLE, PoseLandmark.RIGHT_HEEL,
+     PoseLandmark.RIGHT_FOOT_INDEX),
+)
+
+
+class StrideAnalysis(AnalysisBase):
+    # Campos exportados por frame: contato do pé da frente com o solo, pé da frente (0 esquerdo,
+    # 1 direito), pisada no frame (0 nenhuma, 1 calcanhar, 2 meio do pé, 3 antepé), cadência e passada
+    EXPORT_NAME = "stride"
+    EXPORT_FIELDS = (
+        ("foot_contact", "bool"), ("front_foot", "int8"), ("strike_type", "int8"),
+        ("cadence_spm", "float32"), ("stride_length_cm", "float32"),
+    )
+
+    LANDMARKS = LEGS[0] + LEGS[1]
+    SIGNALS = ("ground_y",)
+    # Pernas e linha do solo
+    OVERLAY_POINTS = LANDMARKS
+    OVERLAY_LINES = tuple(pair for leg in LEGS for pair in zip(leg[:-1], leg[1:]))
+    OVERLAY_GUIDES = (("ground_y", "horizontal"),)
+
+    def __init__(self, parent_layout, mp_pose, max_points=100, initial_frames=30, strike_history=200):
         self.parent_layout = parent_layout
         self.mp_pose = mp_pose
         self.max_points = max_points
         self.initial_frames = initial_frames
+        self.strike_history = strike_history
+
+        self.leg_landmarks = np.array(LEGS)
 
         # Labels para exibir as informações
         self.cadence_label = None
@@ -24,10 +57,19 @@ class StrideAnalysis:
         self.last_step_time = None
         self.cadence = 0  # passos por minuto
 
-        # Variáveis para análise de pisada
-        self.strike_types = []  # Armazena o tipo de pisada (1, 2, 3)
-        self.strike_times = []  # Armazena o timestamp de cada pisada
+        # Tipo (1, 2, 3) e instante de cada pisada da sessão, com memória fixa: as últimas
+        # strike_history completas e as anteriores em blocos de 16 pisadas
+        self.strikes = TieredHistory(1, recent=strike_history, bucket_sizes=(16,), buckets=1024)
+        self.strike_counts = {1: 0, 2: 0, 3: 0}  # Contagem de toda a sessão
         self.strike_graph = None
+        self.session_checkbox = None
+        self.strike_curves = {}
+        self.dirty = False
+
+        # Estado do último frame, para a exportação
+        self.foot_contact = False
+        self.front_foot = 0
+        self.strike_type = 0
 
         # Variáveis para cálculo do comprimento da passada
         self.speed_input = None  # Campo de entrada para a velocidade da esteira
@@ -66,6 +108,8 @@ class StrideAnalysis:
         self.speed_input = QLineEdit()
         self.speed_input.setPlaceholderText("Velocidade da Esteira (km/h)")
         self.speed_input.setFixedWidth(200)
+        # Lido na thread da GUI; process_frame (na thread do pipeline) só usa self.speed
+        self.speed_input.textChanged.connect(self.on_speed_changed)
 
         # Layout para a entrada
         input_layout = QHBoxLayout()
@@ -79,6 +123,17 @@ class StrideAnalysis:
         self.strike_graph.setLabel('left', 'Tipo de Pisada')
         self.strike_graph.setLabel('bottom', 'Tempo (s)')
         self.strike_graph.showGrid(x=True, y=True)
+        self.strike_graph.getPlotItem().getAxis('left').setTicks([[(1, 'Calcanhar'), (2, 'Meio do Pé'), (3, 'Antepé')]])
+        # Um item de dispersão por tipo de pisada, atualizado no lugar a cada frame
+        self.strike_curves = {
+            strike_type: self.strike_graph.plot([], [], pen=None, symbol='o', symbolBrush=color, symbolSize=10)
+            for strike_type, color in STRIKE_COLORS.items()
+        }
+        configure_fast_plot(self.strike_graph, y_range=(0.5, 3.5))
+        # Sessão inteira: todas as pisadas desde o início, em vez das últimas
+        self.session_checkbox = QCheckBox("Sessão inteira")
+        self.session_checkbox.toggled.connect(self.on_session_toggled)
+        strike_layout.addWidget(self.session_checkbox)
         strike_layout.addWidget(self.strike_graph)
         self.strike_group.setLayout(strike_layout)
 
@@ -115,106 +170,30 @@ class StrideAnalysis:
         self.parent_layout.addWidget(self.strike_group)
         self.parent_layout.addWidget(self.info_group)
 
-    def process_frame(self, annotated_frame, results):
-        """Processa cada frame para a análise de passada."""
-        if not results.pose_landmarks:
-            return
+    def process_frame(self, annotated_frame, landmarks, timestamp_ms, signals):
+        """Processa cada frame para a análise de passada.
+
+        `landmarks` é o array (33, 4) em pixels compartilhado entre as análises;
+        pernas e linha do solo já foram desenhadas pelo AnalysisSet.
+        Os tempos vêm de `timestamp_ms` (posição no vídeo ou instante da captura),
+        então cadência e passada não dependem da velocidade do processamento.
+        """
+        # Coordenadas (2 pernas x 5 pontos x (x, y)) em pixels inteiros
+        legs = landmarks[self.leg_landmarks, :2].astype(np.int32)
 
-        landmarks = results.pose_landmarks.landmark
-        image_height, image_width, _ = annotated_frame.shape
-
-        # Obter coordenadas dos pontos relevantes
-        left_hip = landmarks[self.mp_pose.PoseLandmark.LEFT_HIP.value]
-        right_hip = landmarks[self.mp_pose.PoseLandmark.RIGHT_HIP.value]
-        left_knee = landmarks[self.mp_pose.PoseLandmark.LEFT_KNEE.value]
-        right_knee = landmarks[self.mp_pose.PoseLandmark.RIGHT_KNEE.value]
-        left_ankle = landmarks[self.mp_pose.PoseLandmark.LEFT_ANKLE.value]
-        right_ankle = landmarks[self.mp_pose.PoseLandmark.RIGHT_ANKLE.value]
-        left_heel = landmarks[self.mp_pose.PoseLandmark.LEFT_HEEL.value]
-        right_heel = landmarks[self.mp_pose.PoseLandmark.RIGHT_HEEL.value]
-        left_foot_index = landmarks[self.mp_pose.PoseLandmark.LEFT_FOOT_INDEX.value]
-        right_foot_index = landmarks[self.mp_pose.PoseLandmark.RIGHT_FOOT_INDEX.value]
-
-        # Converter para coordenadas em pixels
-        left_hip_x = int(left_hip.x * image_width)
-        left_hip_y = int(left_hip.y * image_height)
-        right_hip_x = int(right_hip.x * image_width)
-        right_hip_y = int(right_hip.y * image_height)
-
-        left_knee_x = int(left_knee.x * image_width)
-        left_knee_y = int(left_knee.y * image_height)
-        right_knee_x = int(right_knee.x * image_width)
-        right_knee_y = int(right_knee.y * image_height)
-
-        left_ankle_x = int(left_ankle.x * image_width)
-        left_ankle_y = int(left_ankle.y * image_height)
-        right_ankle_x = int(right_ankle.x * image_width)
-        right_ankle_y = int(right_ankle.y * image_height)
-
-        left_heel_x = int(left_heel.x * image_width)
-        left_heel_y = int(left_heel.y * image_height)
-        right_heel_x = int(right_heel.x * image_width)
-        right_heel_y = int(right_heel.y * image_height)
-
-        left_foot_x = int(left_foot_index.x * image_width)
-        left_foot_y = int(left_foot_index.y * image_height)
-        right_foot_x = int(right_foot_index.x * image_width)
-        right_foot_y = int(right_foot_index.y * image_height)
-
-        # Marcar os landmarks
-        points = [
-            (left_hip_x, left_hip_y),
-            (left_knee_x, left_knee_y),
-            (left_ankle_x, left_ankle_y),
-            (left_heel_x, left_heel_y),
-            (left_foot_x, left_foot_y),
-            (right_hip_x, right_hip_y),
-            (right_knee_x, right_knee_y),
-            (right_ankle_x, right_ankle_y),
-            (right_heel_x, right_heel_y),
-            (right_foot_x, right_foot_y)
-        ]
-
-        for x, y in points:
-            cv2.circle(annotated_frame, (x, y), 5, (0, 0, 255), -1)
-
-        # Desenhar linhas unindo os landmarks para cada perna
-        # Perna esquerda
-        cv2.line(annotated_frame, (left_hip_x, left_hip_y), (left_knee_x, left_knee_y), (0, 255, 0), 2)
-        cv2.line(annotated_frame, (left_knee_x, left_knee_y), (left_ankle_x, left_ankle_y), (0, 255, 0), 2)
-        cv2.line(annotated_frame, (left_ankle_x, left_ankle_y), (left_heel_x, left_heel_y), (0, 255, 0), 2)
-        cv2.line(annotated_frame, (left_heel_x, left_heel_y), (left_foot_x, left_foot_y), (0, 255, 0), 2)
-
-        # Perna direita
-        cv2.line(annotated_frame, (right_hip_x, right_hip_y), (right_knee_x, right_knee_y), (0, 255, 0), 2)
-        cv2.line(annotated_frame, (right_knee_x, right_knee_y), (right_ankle_x, right_ankle_y), (0, 255, 0), 2)
-        cv2.line(annotated_frame, (right_ankle_x, right_ankle_y), (right_heel_x, right_heel_y), (0, 255, 0), 2)
-        cv2.line(annotated_frame, (right_heel_x, right_heel_y), (right_foot_x, right_foot_y), (0, 255, 0), 2)
-
-        # Determinar a linha do solo dinamicamente
-        ground_points_y = [
-            left_heel_y,
-            right_heel_y,
-            left_foot_y,
-            right_foot_y
-        ]
-        self.ground_line_y = max(ground_points_y)
-
-
-        # Desenhar a linha do solo
-        cv2.line(annotated_frame, (0, self.ground_line_y), (image_width, self.ground_line_y), (255, 0, 0), 2)
+        # Linha do solo dinâmica (calcanhares e pontas dos pés)
+        self.ground_line_y = int(signals["ground_y"])
 
         # Identificar o pé da frente
-        if left_foot_x < right_foot_x:
-            front_heel_y = left_heel_y
-            front_foot_y = left_foot_y
-        else:
-            front_heel_y = right_heel_y
-            front_foot_y = right_foot_y
+        front = 0 if legs[0, 4, 0] < legs[1, 4, 0] else 1
+        front_heel_y = int(legs[front, 3, 1])
+        front_foot_y = int(legs[front, 4, 1])
 
         # Verificar contato com o solo
-        current_time = time.time()
+        current_time = timestamp_ms / 1000
         foot_contact = False
+        self.front_foot = front
+        self.strike_type = 0
 
         # Se qualquer parte do pé estiver na mesma altura ou abaixo da linha do solo
         if front_foot_y >= self.ground_line_y or front_heel_y >= self.ground_line_y:
@@ -230,8 +209,11 @@ class StrideAnalysis:
 
             # Analisar o tipo de pisada
             self.analyze_foot_strike(front_heel_y, front_foot_y, current_time)
+            self.dirty = True
+        self.foot_contact = foot_contact
 
-        # Atualizar labels e gráficos
+    def update_ui(self):
+        """Atualiza os labels e o gráfico com os valores atuais."""
         self.cadence_label.setText(f"Cadência: {self.cadence:.1f} passos/min")
         self.speed_label.setText(f"Velocidade Estimada: {self.speed:.2f} km/h")
         self.stride_length_label.setText(f"Comprimento da Passada: {self.stride_length:.1f} cm")
@@ -248,30 +230,42 @@ class StrideAnalysis:
             strike_type = 2  # Meio do Pé
 
         # Armazenar o tipo de pisada e o timestamp
-        self.strike_types.append(strike_type)
-        self.strike_times.append(current_time - self.initial_frames)
+        self.strike_type = strike_type
+        self.strikes.append(current_time * 1000, (strike_type,))
+        self.strike_counts[strike_type] += 1
 
     def update_strike_graph(self):
-        """Atualiza o gráfico do tipo de pisada."""
-        if len(self.strike_times) > 0:
-            times = np.array(self.strike_times)
-            times = times - times[0]  # Normalizar o tempo
-            types = np.array(self.strike_types)
-
-            self.strike_graph.clear()
+        """Atualiza o gráfico do tipo de pisada com as últimas strike_history pisadas ou, com `Sessão inteira`, todas."""
+        if len(self.strikes) == 0:
+            return
+        if self.session_checkbox.isChecked():
+            # Antes das pisadas guardadas completas, o tipo médio de cada bloco, arredondado
+            times, means, _, _ = self.strikes.window()
+            types = np.rint(means[0])
+        else:
+            times, types = self.strikes.last(self.strike_history)
+            types = types[0]
+        times = (times - self.strikes.first_ms) / 1000  # Segundos desde a primeira pisada
 
-            # Mapear tipos de pisada para cores
-            color_map = {1: 'b', 2: 'g', 3: 'r'}
-            colors = [color_map[t] for t in types]
+        for strike_type, curve in self.strike_curves.items():
+            mask = types == strike_type
+            curve.setData(times[mask], types[mask])
 
-            # Plotar os pontos
-            for t, y, c in zip(times, types, colors):
-                self.strike_graph.plot([t], [y], pen=None, symbol='o', symbolBrush=c, symbolSize=10)
+        # Eixo X acompanha as pisadas exibidas, sem autoajuste a cada setData
+        self.strike_graph.setXRange(times[0], max(times[-1], times[0] + 1), padding=0.05)
 
-            # Configurar o eixo y
-            self.strike_graph.getPlotItem().getAxis('left').setTicks([[(1, 'Calcanhar'), (2, 'Meio do Pé'), (3, 'Antepé')]])
+    def on_session_toggled(self, checked):
+        self.dirty = True
 
-            self.strike_graph.repaint()
+    def on_speed_changed(self, text):
+        """Guarda a velocidade digitada; campo vazio vale 0 e texto inválido é ignorado."""
+        if not text.strip():
+            self.speed = 0
+            return
+        try:
+            self.speed = float(text.replace(",", "."))
+        except ValueError:
+            pass
 
     def update_cadence(self):
         """Atualiza a cadência e calcula o comprimento da passada."""
@@ -279,24 +273,34 @@ class StrideAnalysis:
             average_step_time = sum(self.step_times) / len(self.step_times)
             self.cadence = (60 / average_step_time)
 
-            # Calcular o comprimento da passada
-            try:
-                speed = float(self.speed_input.text())
-                self.speed = speed  # Atualizar a velocidade
-
-                # Converter velocidade para m/s
-                speed_m_per_sec = speed / 3.6
-                # Converter cadência para passos por segundo
-                cadence_per_sec = self.cadence / 60
-                # Calcular comprimento da passada em metros
-                stride_length_m = speed_m_per_sec / cadence_per_sec
-                # Converter para centímetros
-                self.stride_length = stride_length_m * 100
-
-            except ValueError:
-                # Se a velocidade não for um número válido
-                self.speed = 0
-                self.stride_length = 0
+            # Comprimento da passada pela velocidade da esteira (do campo na interface ou do modo em lote)
+            # Converter velocidade para m/s
+            speed_m_per_sec = self.speed / 3.6
+            # Converter cadência para passos por segundo
+            cadence_per_sec = self.cadence / 60
+            # Calcular comprimento da passada em metros
+            stride_length_m = speed_m_per_sec / cadence_per_sec
+            # Converter para centímetros
+            self.stride_length = stride_length_m * 100
+
+    def export_record(self):
+        """Valores do último frame, na ordem de EXPORT_FIELDS."""
+        return self.foot_contact, self.front_foot, self.strike_type, self.cadence, self.stride_length
+
+    def get_results(self):
+        """Retorna cadência, comprimento da passada e contagem dos tipos de pisada."""
+        strike_counts = {
+            "calcanhar": self.strike_counts[1],
+            "meio_do_pe": self.strike_counts[2],
+            "antepe": self.strike_counts[3],
+        }
+        return {
+            "cadence_spm": float(self.cadence),
+            "speed_kmh": float(self.speed),
+            "stride_length_cm": float(self.stride_length),
+            "steps": sum(self.strike_counts.values()),
+            "strike_counts": strike_counts,
+        }
 
     def reset(self):
         """Reseta as variáveis específicas da análise de passada."""
@@ -305,11 +309,15 @@ class StrideAnalysis:
         self.cadence = 0
         self.speed = 0
         self.stride_length = 0
-        self.cadence_label.setText("Cadência: 0 passos/min")
-        self.speed_label.setText("Velocidade Estimada: 0 km/h")
-        self.stride_length_label.setText("Comprimento da Passada: 0 cm")
-        self.speed_input.clear()
-        self.strike_types.clear()
-        self.strike_times.clear()
-        if self.strike_graph:
-            self.strike_graph.clear()
+        if self.cadence_label is not None:
+            self.cadence_label.setText("Cadência: 0 passos/min")
+            self.speed_label.setText("Velocidade Estimada: 0 km/h")
+            self.stride_length_label.setText("Comprimento da Passada: 0 cm")
+            self.speed_input.clear()
+        self.strikes.clear()
+        self.strike_counts = {1: 0, 2: 0, 3: 0}
+        self.foot_contact = False
+        self.front_foot = 0
+        self.strike_type = 0
+        for curve in self.strike_curves.values():
+            curve.clear()
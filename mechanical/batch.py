@@ -0,0 +1,383 @@
+"""Execução das análises sem interface gráfica, para processar vídeos em lote.
+
+Uso:
+    python mechanical/batch.py video.mp4 --analysis stride,posture,oscillation --output metrics.jsonl
+    python mechanical/batch.py pasta_de_videos/ --workers 16
+    python mechanical/batch.py video.mp4 --analysis gait
+    python mechanical/batch.py pasta_de_videos/ --export exportacoes/
+
+Com mais de um worker, cada processo mantém sua própria instância do Pose e
+suas próprias análises, e os vídeos são distribuídos entre os processos.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import cv2
+import numpy as np
+
+from analysis.base import AnalysisSet
+from analysis.ocillation import OscillationAnalysis
+from analysis.posture import PostureAnalysis
+from analysis.stride import StrideAnalysis
+from cache import DEFAULT_CACHE_DIR, LandmarkCache, LandmarkRecorder
+from export import FrameExporter, export_path
+from gait import analyze_gait
+from pose import DEFAULT_POSE_PARAMS, create_pose, mp_pose, run_pose
+from tracking import RoiPose, SkippingPose
+from landmarker import MODEL_VARIANTS, TasksPose, model_path
+
+ANALYSES = {
+    "oscillation": OscillationAnalysis,
+    "posture": PostureAnalysis,
+    "stride": StrideAnalysis,
+}
+
+# Análises feitas de uma vez sobre as séries completas de landmarks do vídeo
+OFFLINE_ANALYSES = ("gait",)
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov")
+
+# Instância do Pose de cada processo worker, criada no primeiro vídeo fora do cache
+worker_pose = None
+# Parâmetros (model_complexity, model) do Pose do worker, definidos em init_worker
+worker_pose_args = None
+
+
+def create_analyses(analysis_names, max_points=100, initial_frames=30, treadmill_speed=0):
+    """Instancia as análises por frame pedidas, sem componentes de UI."""
+    analyses = {}
+    for name in analysis_names:
+        if name not in ANALYSES:
+            continue
+        analysis = ANALYSES[name](None, mp_pose, max_points, initial_frames)
+        if isinstance(analysis, StrideAnalysis):
+            analysis.speed = treadmill_speed
+        analyses[name] = analysis
+    return analyses
+
+
+def iter_cached_frames(cached):
+    """Reproduz os landmarks do cache sem decodificar o vídeo nem executar a inferência."""
+    # As análises só desenham no frame; um quadro vazio reaproveitado basta
+    canvas = np.zeros((cached.height, cached.width, 3), dtype=np.uint8)
+    for index in range(len(cached)):
+        yield canvas, cached.results(index), float(cached.timestamps[index])
+
+
+def iter_inference_frames(cap, pose, recorder=None):
+    """Decodifica o vídeo e executa a inferência em cada frame, registrando os landmarks."""
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        timestamp_ms = cap.get(cv2.CAP_PROP_POS_MSEC)
+        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        results = run_pose(pose, frame_rgb, timestamp_ms)
+        if recorder is not None:
+            recorder.add(results, timestamp_ms)
+        # Sem exibição, o próprio frame serve de área de desenho
+        yield frame, results, timestamp_ms
+
+
+def create_batch_pose(model_complexity=2, model=None):
+    """Cria o Pose legado ou, se `model` for lite/full/heavy, o PoseLandmarker em modo VIDEO."""
+    if model is not None:
+        return TasksPose(model, live=False)
+    return create_pose(**dict(DEFAULT_POSE_PARAMS, model_complexity=model_complexity))
+
+
+def batch_pose_params(model_complexity=2, model=None):
+    """Parâmetros que identificam o backend no cache (os mesmos usados pela interface)."""
+    if model is not None:
+        return dict(DEFAULT_POSE_PARAMS, backend="tasks", model=model)
+    return dict(DEFAULT_POSE_PARAMS, model_complexity=model_complexity)
+
+
+def analyze_video(video_path, analysis_names, model_complexity=2, treadmill_speed=0,
+                  max_points=100, initial_frames=30, pose=None, cache=None, roi=False, model=None,
+                  infer_every=1, export_dir=None, pose_factory=None):
+    """Processa um vídeo do início ao fim, o mais rápido possível, e retorna as métricas.
+
+    Se `pose` for informado, a instância é reaproveitada (com o rastreamento
+    reiniciado) em vez de criar e fechar uma nova; `pose_factory` faz o mesmo,
+    mas só obtém a instância se o vídeo precisar de inferência. Com `cache`, vídeos já
+    processados com os mesmos parâmetros são reproduzidos sem inferência. Com
+    `roi`, a inferência usa apenas a região do atleta encontrada no frame anterior.
+    `model` seleciona o PoseLandmarker (lite/full/heavy) em vez do Pose legado.
+    Com `infer_every` > 1, a inferência roda a cada N frames e os landmarks dos
+    frames intermediários são previstos. A análise `gait` roda depois, sobre os
+    arrays de landmarks do vídeo inteiro; com o vídeo no cache e sem análises por
+    frame, nenhum frame é percorrido. Com `export_dir`, os valores por frame das
+    análises são gravados em `<export_dir>/<nome do vídeo>.parquet` (ou `.csv`).
+    """
+    pose_params = batch_pose_params(model_complexity, model)
+    # O recorte altera os landmarks, então o cache é separado
+    cache_params = dict(pose_params, roi_tracking=True) if roi else pose_params
+    if infer_every > 1:
+        cache_params = dict(cache_params, infer_every=infer_every)
+    cache_key = cache.key_for(video_path, cache_params) if cache is not None else None
+    cached = cache.load(cache_key) if cache is not None else None
+    analyses = create_analyses(analysis_names, max_points, initial_frames, treadmill_speed)
+    offline = "gait" in analysis_names
+
+    cap = None
+    recorder = None
+    owns_pose = False
+    if cached is not None:
+        # Só a análise offline: os arrays do cache bastam
+        frames_iter = iter_cached_frames(cached) if analyses else iter(())
+    else:
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise IOError(f"Erro ao abrir o vídeo {video_path}")
+        if pose is None and pose_factory is not None:
+            pose = pose_factory()
+        owns_pose = pose is None
+        if owns_pose:
+            pose = create_batch_pose(model_complexity, model)
+        else:
+            pose.reset()
+        if cache is not None or offline:
+            recorder = LandmarkRecorder()
+        frame_pose = RoiPose(pose) if roi else pose
+        if infer_every > 1:
+            frame_pose = SkippingPose(frame_pose, infer_every)
+        frames_iter = iter_inference_frames(cap, frame_pose, recorder)
+
+    exporter = None
+    if export_dir is not None and analyses:
+        name = os.path.splitext(os.path.basename(video_path))[0]
+        exporter = FrameExporter(export_path(export_dir, name), analyses.values(), blocking=True)
+
+    analysis_set = AnalysisSet(analyses.values())
+    frames = 0
+    frames_detected = 0
+    frame_size = None
+    start = time.perf_counter()
+    try:
+        for frame, results, timestamp_ms in frames_iter:
+            frames += 1
+            frame_size = (frame.shape[1], frame.shape[0])
+            landmarks = analysis_set.process(frame, results, timestamp_ms)
+            if landmarks is not None:
+                frames_detected += 1
+            if exporter is not None:
+                exporter.add(timestamp_ms, landmarks is not None)
+    finally:
+        if cap is not None:
+            cap.release()
+        if owns_pose:
+            pose.close()
+        if exporter is not None:
+            exporter.close()
+
+    analysis_results = {name: analysis.get_results() for name, analysis in analyses.items()}
+    if cached is not None:
+        series, timestamps = cached.landmarks, cached.timestamps
+        frame_size = (cached.width, cached.height)
+        frames = len(series)
+        frames_detected = int(np.count_nonzero(~np.isnan(series[:, 0, 0])))
+    elif offline and frame_size is not None:
+        series, timestamps = np.stack(recorder.landmarks), np.asarray(recorder.timestamps, dtype=np.float64)
+    # Gravado antes da análise de marcha: se ela falhar, a inferência do vídeo não se perde
+    if cache is not None and cached is None and frame_size is not None:
+        recorder.save(cache, cache_key, frame_size[0], frame_size[1], cache_params)
+
+    if offline and frame_size is not None:
+        try:
+            analysis_results["gait"] = analyze_gait(series, timestamps, frame_size[0], frame_size[1],
+                                                    treadmill_speed)
+        except Exception as error:
+            # As demais análises seguem no resultado; só a marcha registra o erro
+            analysis_results["gait"] = {"error": f"{type(error).__name__}: {error}"}
+    elapsed = time.perf_counter() - start
+
+    result = {
+        "video": video_path,
+        "frames": frames,
+        "frames_detected": frames_detected,
+        "elapsed_s": elapsed,
+        # Do cache não há decodificação nem inferência: a vazão não é comparável à de um processamento
+        "fps": None if cached is not None else (frames / elapsed if elapsed > 0 else 0.0),
+        "from_cache": cached is not None,
+        "analyses": analysis_results,
+    }
+    if exporter is not None:
+        result["export"] = exporter.path
+    return result
+
+
+def init_worker(model_complexity, model=None):
+    """Inicializa um processo worker; seu Pose só é criado no primeiro vídeo fora do cache."""
+    global worker_pose, worker_pose_args
+    # Cada processo usa um núcleo; threads internas do OpenCV só competiriam entre si
+    cv2.setNumThreads(1)
+    worker_pose = None
+    worker_pose_args = (model_complexity, model)
+
+
+def get_worker_pose():
+    """Pose do worker, criado na primeira chamada e reaproveitado nos vídeos seguintes."""
+    global worker_pose
+    if worker_pose is None:
+        worker_pose = create_batch_pose(*worker_pose_args)
+    return worker_pose
+
+
+def close_worker_pose():
+    """Fecha o Pose do worker, se algum vídeo chegou a criá-lo."""
+    global worker_pose
+    if worker_pose is not None:
+        worker_pose.close()
+        worker_pose = None
+
+
+def analyze_video_in_worker(video_path, analysis_names, model_complexity, model, treadmill_speed,
+                            initial_frames, cache_dir, roi, infer_every=1, export_dir=None):
+    """Executa analyze_video no worker, devolvendo o erro como resultado em vez de propagá-lo."""
+    cache = LandmarkCache(cache_dir) if cache_dir else None
+    try:
+        return analyze_video(video_path, analysis_names, model_complexity=model_complexity,
+                             treadmill_speed=treadmill_speed, initial_frames=initial_frames,
+                             pose_factory=get_worker_pose, cache=cache, roi=roi, model=model,
+                             infer_every=infer_every, export_dir=export_dir)
+    except Exception as error:
+        return {"video": video_path, "error": f"{type(error).__name__}: {error}"}
+
+
+def collect_videos(paths):
+    """Expande diretórios em arquivos de vídeo, mantendo os arquivos informados diretamente."""
+    videos = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith(VIDEO_EXTENSIONS):
+                    videos.append(os.path.join(path, name))
+        else:
+            videos.append(path)
+    return videos
+
+
+def run_batch(videos, analysis_names, workers, model_complexity=2, treadmill_speed=0, initial_frames=30,
+              cache_dir=DEFAULT_CACHE_DIR, roi=False, model=None, infer_every=1, export_dir=None):
+    """Distribui os vídeos entre `workers` processos e gera os resultados conforme terminam."""
+    job_args = (analysis_names, model_complexity, model, treadmill_speed, initial_frames, cache_dir, roi, infer_every,
+                export_dir)
+    if workers <= 1:
+        init_worker(model_complexity, model)
+        try:
+            for video_path in videos:
+                yield analyze_video_in_worker(video_path, *job_args)
+        finally:
+            close_worker_pose()
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(model_complexity, model)) as executor:
+        futures = {executor.submit(analyze_video_in_worker, video_path, *job_args): video_path
+                   for video_path in videos}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except BrokenProcessPool as error:
+                # Um worker morreu (ex.: falha no Mediapipe): os vídeos que estavam no pool viram erros
+                yield {"video": futures[future], "error": f"{type(error).__name__}: {error}"}
+
+
+def parse_analysis_names(value):
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in ANALYSES and name not in OFFLINE_ANALYSES]
+    if unknown or not names:
+        raise argparse.ArgumentTypeError(
+            f"Análise inválida: {', '.join(unknown) or value}. Opções: {', '.join((*ANALYSES, *OFFLINE_ANALYSES))}"
+        )
+    return names
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Análise da mecânica de corrida sem interface gráfica.")
+    parser.add_argument("videos", nargs="+", help="Arquivos de vídeo ou diretórios com vídeos a analisar.")
+    parser.add_argument("--analysis", type=parse_analysis_names, default=list(ANALYSES),
+                        help="Análises separadas por vírgula: oscillation, posture e stride, frame a frame, "
+                             "e gait, sobre as séries do vídeo inteiro (padrão: as análises frame a frame).")
+    parser.add_argument("--output", default="metrics.jsonl",
+                        help="Arquivo de saída com uma linha JSON por vídeo.")
+    parser.add_argument("--model-complexity", type=int, choices=(0, 1, 2), default=2)
+    parser.add_argument("--model", choices=MODEL_VARIANTS, default=None,
+                        help="Usa o PoseLandmarker com models/pose_landmarker_<model>.task em vez do Pose legado.")
+    parser.add_argument("--speed", type=float, default=0,
+                        help="Velocidade da esteira em km/h, usada no comprimento da passada.")
+    parser.add_argument("--initial-frames", type=int, default=30)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Número de processos (padrão: um por núcleo).")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help="Diretório do cache de landmarks.")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Sempre executa a inferência, sem ler nem gravar o cache.")
+    parser.add_argument("--roi", action="store_true",
+                        help="Recorta a inferência em torno do atleta detectado no frame anterior.")
+    parser.add_argument("--infer-every", type=int, default=1, metavar="N",
+                        help="Roda a inferência a cada N frames e prevê os landmarks entre elas "
+                             "(para vídeos de 120 a 240 fps).")
+    parser.add_argument("--export", default=None, metavar="DIR",
+                        help="Grava os valores por frame das análises de cada vídeo em DIR "
+                             "(Parquet com o pyarrow instalado, senão CSV).")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    videos = collect_videos(args.videos)
+    if args.model is not None and not os.path.exists(model_path(args.model)):
+        print(f"Modelo não encontrado: {model_path(args.model)}", file=sys.stderr)
+        return 1
+    workers = max(1, min(args.workers, len(videos)))
+    if args.export is not None:
+        os.makedirs(args.export, exist_ok=True)
+
+    failures = 0
+    total_frames = 0
+    start = time.perf_counter()
+    with open(args.output, "a", encoding="utf-8") as output:
+        results = run_batch(videos, args.analysis, workers,
+                            model_complexity=args.model_complexity,
+                            treadmill_speed=args.speed,
+                            initial_frames=args.initial_frames,
+                            cache_dir=None if args.no_cache else args.cache_dir,
+                            roi=args.roi,
+                            model=args.model,
+                            infer_every=max(1, args.infer_every),
+                            export_dir=args.export)
+        for done, result in enumerate(results, start=1):
+            output.write(json.dumps(result, ensure_ascii=False) + "\n")
+            output.flush()
+
+            name = os.path.basename(result["video"])
+            if "error" in result:
+                failures += 1
+                print(f"[{done}/{len(videos)}] {name}: falhou ({result['error']})", file=sys.stderr)
+            elif result["from_cache"]:
+                print(f"[{done}/{len(videos)}] {name}: {result['frames']} frames do cache em "
+                      f"{result['elapsed_s']:.1f}s")
+            else:
+                total_frames += result["frames"]
+                print(f"[{done}/{len(videos)}] {name}: {result['frames']} frames em "
+                      f"{result['elapsed_s']:.1f}s ({result['fps']:.1f} fps)")
+    elapsed = time.perf_counter() - start
+
+    # A vazão agregada conta só os vídeos processados (os do cache não passam pela inferência)
+    if total_frames:
+        throughput = f"{total_frames / elapsed if elapsed > 0 else 0:.1f} fps agregados com {workers} processos"
+    else:
+        throughput = "nenhum vídeo passou pela inferência"
+    print(f"{len(videos) - failures} vídeos processados, {failures} falhas, {throughput}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,578 @@
+"""Benchmark reproduzível de cada etapa do processamento de um frame.
+
+Uso:
+    python mechanical/benchmark.py --output benchmark.json
+    python mechanical/benchmark.py --clip video.mp4 --complexities 0 1 --output benchmark.json
+    python mechanical/benchmark.py --soak-hours 3 --output soak.json
+
+Não precisa de câmera nem de rede: sem `--clip`, gera um vídeo sintético com
+um corredor desenhado. Mede separadamente a decodificação, a conversão BGR→RGB,
+a inferência de cada `model_complexity` (e de cada modelo .task disponível), a
+conversão dos landmarks para o array em pixels (de todos e só dos usados pelas
+análises), o `process_frame` de cada análise e de todas juntas num AnalysisSet
+(incluindo os sinais e o que elas desenham no frame), os overlays da sessão e a
+exibição: o caminho atual (redimensionamento único e QImage BGR sem cópia) e o
+anterior (cópia do frame, BGR→RGB e `scaled()` do Qt), para comparar o ganho
+por frame (ex.: com `--size 1920x1080`), e a gravação do vídeo anotado, vista
+de quem grava: a entrega à thread do SessionRecorder e, para comparar, o
+`cv2.VideoWriter.write` direto no loop de frames. Mede também a abertura da interface,
+em processos novos: até a janela aparecer e até o aquecimento (Mediapipe,
+pyqtgraph e Pose) terminar. Os landmarks entregues às
+análises são sintéticos, para que o tempo delas não dependa de haver detecção.
+O resultado (vazão e latências p50/p95/p99) é gravado em JSON junto com a
+versão do código e o hardware, para comparar execuções. Os modelos das
+complexidades 0 e 2 são baixados pelo Mediapipe no primeiro uso; sem rede e sem
+eles instalados, essas etapas aparecem com o campo `error`.
+
+Com `--soak-hours`, em vez das etapas, simula uma sessão longa (só as análises,
+com landmarks sintéticos) e registra a memória residente ao longo dela, para
+confirmar que os históricos não crescem com a duração da sessão.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import cv2
+import mediapipe as mp
+import numpy as np
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage
+
+from analysis.base import AnalysisSet
+from batch import ANALYSES, create_analyses
+from display import FrameDisplay, bgr_to_qimage
+from landmarker import MODEL_VARIANTS, TasksPose, model_path
+from pose import NUM_LANDMARKS, Landmark, PoseLandmarks, create_pose, landmarks_to_pixels, run_pose
+from quality import AdaptivePose, QualityController
+from recorder import SessionRecorder
+from tracking import RoiPose, SkippingPose
+
+MECHANICAL_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(MECHANICAL_DIR)
+
+# Executado em um processo novo para medir a abertura da interface sem módulos já importados
+STARTUP_SCRIPT = """
+import os, sys, time
+start = time.perf_counter()
+from PyQt5.QtWidgets import QApplication
+app = QApplication(sys.argv)
+import main
+window = main.VideoWindow()
+window.show()
+app.processEvents()
+window_ms = (time.perf_counter() - start) * 1000
+window.warm_up_thread.join()
+ready_ms = (time.perf_counter() - start) * 1000
+print(window_ms, ready_ms, flush=True)
+os._exit(0)
+"""
+
+# Segmentos do corpo desenhados no vídeo sintético
+SKELETON = [
+    (11, 12), (11, 23), (12, 24), (23, 24), (11, 13), (13, 15), (12, 14), (14, 16),
+    (23, 25), (25, 27), (27, 29), (29, 31), (27, 31), (24, 26), (26, 28), (28, 30), (30, 32), (28, 32),
+]
+
+
+def synthetic_landmarks(t, cadence_spm=180):
+    """Landmarks (33, 4) normalizados de um corredor visto de lado no instante `t` (segundos)."""
+    landmarks = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+    landmarks[:, 3] = 1.0
+    # Cada perna completa um ciclo a cada dois passos
+    phase = 2 * math.pi * cadence_spm / 120 * t
+    bounce = 0.015 * math.cos(2 * phase)
+
+    hip = (0.5, 0.5 + bounce)
+    shoulder = (0.52, 0.3 + bounce)
+    landmarks[0:11, 0] = 0.54
+    landmarks[0:11, 1] = 0.2 + bounce
+    for side, offset in ((0, 0.0), (1, math.pi)):
+        swing = math.cos(phase + offset)
+        lift = max(0.0, math.sin(phase + offset)) * 0.06
+        ankle = (hip[0] + 0.1 * swing, 0.85 - lift)
+        knee = ((hip[0] + ankle[0]) / 2 + 0.04, (hip[1] + ankle[1]) / 2)
+        elbow = (shoulder[0] - 0.06 * swing, shoulder[1] + 0.1)
+        wrist = (elbow[0] + 0.05, elbow[1] - 0.03)
+        landmarks[11 + side, :2] = shoulder
+        landmarks[13 + side, :2] = elbow
+        landmarks[[15 + side, 17 + side, 19 + side, 21 + side], :2] = wrist
+        landmarks[23 + side, :2] = hip
+        landmarks[25 + side, :2] = knee
+        landmarks[27 + side, :2] = ankle
+        landmarks[29 + side, :2] = (ankle[0] - 0.02, ankle[1] + 0.03)
+        landmarks[31 + side, :2] = (ankle[0] + 0.04, ankle[1] + 0.035)
+    return landmarks
+
+
+def make_synthetic_clip(path, frames=300, width=1280, height=720, fps=30):
+    """Grava um vídeo determinístico com o corredor sintético sobre um fundo texturizado."""
+    rng = np.random.default_rng(0)
+    background = rng.integers(60, 120, size=(height, width, 3), dtype=np.uint8)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    if not writer.isOpened():
+        raise IOError(f"Erro ao criar o vídeo sintético {path}")
+    # O fundo desliza como numa câmera acompanhando a esteira, para a compressão não ser trivial
+    for index in range(frames):
+        frame = np.roll(background, -4 * index, axis=1)
+        points = synthetic_landmarks(index / fps)[:, :2] * (width, height)
+        points = points.astype(int)
+        for start, end in SKELETON:
+            cv2.line(frame, tuple(points[start]), tuple(points[end]), (200, 180, 160), 12)
+        cv2.circle(frame, tuple(points[0]), 28, (180, 170, 200), -1)
+        writer.write(frame)
+    writer.release()
+
+
+def iter_frames(clip_path, limit=None):
+    cap = cv2.VideoCapture(clip_path)
+    if not cap.isOpened():
+        raise IOError(f"Erro ao abrir o vídeo {clip_path}")
+    try:
+        count = 0
+        while limit is None or count < limit:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield frame
+            count += 1
+    finally:
+        cap.release()
+
+
+def summarize(samples_ms, warmup=0):
+    """Vazão e latências de uma etapa, descartando as `warmup` primeiras medições."""
+    samples = np.asarray(samples_ms[warmup:], dtype=np.float64)
+    if samples.size == 0:
+        return {"samples": 0}
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    mean = float(samples.mean())
+    return {
+        "samples": int(samples.size),
+        "mean_ms": mean,
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "max_ms": float(samples.max()),
+        "throughput_fps": 1000 / mean if mean > 0 else None,
+    }
+
+
+def time_call(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def bench_decode(clip_path):
+    samples = []
+    cap = cv2.VideoCapture(clip_path)
+    try:
+        while True:
+            (ret, _), elapsed = time_call(cap.read)
+            if not ret:
+                break
+            samples.append(elapsed)
+    finally:
+        cap.release()
+    return samples
+
+
+def bench_cvt_color(clip_path):
+    samples = []
+    for frame in iter_frames(clip_path):
+        _, elapsed = time_call(cv2.cvtColor, frame, cv2.COLOR_BGR2RGB)
+        samples.append(elapsed)
+    return samples
+
+
+def bench_inference(clip_path, pose, limit, fps):
+    samples = []
+    for index, frame in enumerate(iter_frames(clip_path, limit)):
+        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        _, elapsed = time_call(run_pose, pose, frame_rgb, index * 1000 / fps)
+        samples.append(elapsed)
+    return samples
+
+
+def bench_analysis(clip_path, analyses, fps):
+    """Sinais, desenho e process_frame das análises, executadas juntas por um AnalysisSet."""
+    analysis_set = AnalysisSet(analyses)
+    samples = []
+    for index, frame in enumerate(iter_frames(clip_path)):
+        annotated_frame = frame.copy()
+        height, width = frame.shape[:2]
+        landmarks = synthetic_landmarks(index / fps) * np.array((width, height, width, 1), dtype=np.float32)
+        _, elapsed = time_call(analysis_set.process_landmarks, annotated_frame, landmarks, index * 1000 / fps)
+        samples.append(elapsed)
+    return samples
+
+
+def bench_landmark_conversion(clip_path, fps, indexes=None):
+    """Conversão, uma vez por frame, do resultado do Pose para o array em pixels das análises.
+
+    Com `indexes`, só esses landmarks são convertidos, como no AnalysisSet.
+    """
+    samples = []
+    for index, frame in enumerate(iter_frames(clip_path)):
+        height, width = frame.shape[:2]
+        # Objetos com atributos, como os do Pose, sem o array pronto dos resultados do cache
+        results = type("Results", (), {})()
+        results.pose_landmarks = PoseLandmarks([Landmark(*row) for row in synthetic_landmarks(index / fps).tolist()])
+        _, elapsed = time_call(landmarks_to_pixels, results, width, height, indexes)
+        samples.append(elapsed)
+    return samples
+
+
+def session_overlays(width, height):
+    """Overlays desenhados pela interface com ROI, pulo de frames e qualidade adaptativa ativos."""
+    roi_pose = RoiPose(None)
+    roi_pose.roi = (width // 4, height // 8, width * 3 // 4, height * 7 // 8)
+    skipping_pose = SkippingPose(None)
+    adaptive_pose = AdaptivePose(QualityController(33), lambda model_complexity: None)
+    return [roi_pose.draw_overlay, skipping_pose.draw_overlay, adaptive_pose.draw_overlay]
+
+
+def bench_overlays(clip_path):
+    """Desenho dos overlays da sessão sobre o próprio frame, como em update_frame."""
+    samples = []
+    overlays = None
+    for frame in iter_frames(clip_path):
+        if overlays is None:
+            overlays = session_overlays(frame.shape[1], frame.shape[0])
+        start = time.perf_counter()
+        for draw_overlay in overlays:
+            draw_overlay(frame)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def legacy_display(frame, width, height):
+    """Caminho de exibição anterior: cópia do frame, BGR→RGB, QImage e `scaled()` do Qt."""
+    annotated_frame = frame.copy()
+    rgb_image = cv2.cvtColor(annotated_frame, cv2.COLOR_BGR2RGB)
+    h, w, ch = rgb_image.shape
+    image = QImage(rgb_image.data, w, h, ch * w, QImage.Format_RGB888)
+    return image.scaled(width, height, Qt.KeepAspectRatio)
+
+
+def bench_display(clip_path, display_size):
+    """Redimensionamento único no buffer reaproveitado e QImage BGR sobre os dados, como em FrameDisplay.show."""
+    display = FrameDisplay()
+    display.resize(*display_size)
+    samples = []
+    for frame in iter_frames(clip_path):
+        start = time.perf_counter()
+        image = display.fit(frame, display.buffer)
+        if image is not frame:
+            display.buffer = image
+        bgr_to_qimage(image)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def bench_legacy_display(clip_path, display_size):
+    samples = []
+    for frame in iter_frames(clip_path):
+        _, elapsed = time_call(legacy_display, frame, *display_size)
+        samples.append(elapsed)
+    return samples
+
+
+def bench_recording(clip_path, fps):
+    """Custo de `SessionRecorder.write` no loop de frames; a codificação roda na thread do recorder."""
+    samples = []
+    with tempfile.TemporaryDirectory() as directory:
+        recorder = SessionRecorder(os.path.join(directory, "gravacao.mp4"), fps)
+        try:
+            for index, frame in enumerate(iter_frames(clip_path)):
+                _, elapsed = time_call(recorder.write, frame, index * 1000 / fps)
+                samples.append(elapsed)
+        finally:
+            recorder.close()
+    return samples
+
+
+def bench_inline_recording(clip_path, fps):
+    """`cv2.VideoWriter.write` direto no loop de frames, sem thread."""
+    samples = []
+    with tempfile.TemporaryDirectory() as directory:
+        writer = None
+        try:
+            for frame in iter_frames(clip_path):
+                if writer is None:
+                    writer = cv2.VideoWriter(os.path.join(directory, "gravacao.mp4"), cv2.VideoWriter_fourcc(*"mp4v"),
+                                             fps, (frame.shape[1], frame.shape[0]))
+                _, elapsed = time_call(writer.write, frame)
+                samples.append(elapsed)
+        finally:
+            if writer is not None:
+                writer.release()
+    return samples
+
+
+def measure_startup(runs):
+    """Tempo até a janela aparecer e até o aquecimento terminar, em `runs` processos novos (plataforma offscreen)."""
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT], cwd=MECHANICAL_DIR, env=env,
+                                capture_output=True, text=True, check=True).stdout
+        window_ms, ready_ms = (float(value) for value in output.split()[-2:])
+        samples.append({"window": window_ms, "ready": ready_ms})
+    return samples
+
+
+def current_rss_mb():
+    """Memória residente atual do processo, lida de /proc (Linux); None em outros sistemas."""
+    try:
+        with open("/proc/self/statm") as statm:
+            resident_pages = int(statm.read().split()[1])
+    except OSError:
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def run_soak(hours, fps=30, checkpoints=36, size=(640, 480), log=print):
+    """Simula uma sessão de `hours` horas e mede a memória residente ao longo dela.
+
+    Todas as análises recebem landmarks sintéticos a `fps`, com os timestamps da
+    sessão simulada, sem decodificação nem inferência. A cada checkpoint, o
+    histórico da sessão inteira é lido, como nos gráficos.
+    """
+    analyses = create_analyses(list(ANALYSES))
+    analysis_set = AnalysisSet(analyses.values())
+    histories = [analyses["oscillation"].history, analyses["stride"].strikes]
+    width, height = size
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    scale = np.array((width, height, width, 1), dtype=np.float32)
+    total_frames = int(hours * 3600 * fps)
+    interval = max(total_frames // checkpoints, 1)
+    samples = []
+    start = time.perf_counter()
+    for index in range(total_frames):
+        landmarks = synthetic_landmarks(index / fps) * scale
+        analysis_set.process_landmarks(frame, landmarks, index * 1000 / fps)
+        if (index + 1) % interval == 0:
+            for history in histories:
+                history.window()
+            sample = {
+                "session_min": round((index + 1) / fps / 60, 1),
+                "rss_mb": current_rss_mb(),
+                "history_kb": sum(history.nbytes for history in histories) / 1024,
+            }
+            samples.append(sample)
+            # Fora do Linux não há /proc para ler a memória residente
+            rss_text = f"{sample['rss_mb']:.1f} MB" if sample["rss_mb"] is not None else "memória indisponível"
+            log(f"{sample['session_min']:.0f} min: {rss_text}")
+    rss = [sample["rss_mb"] for sample in samples if sample["rss_mb"] is not None]
+    return {
+        "hours": hours,
+        "fps": fps,
+        "frames": total_frames,
+        "elapsed_s": time.perf_counter() - start,
+        "checkpoints": samples,
+        # Do primeiro checkpoint (com o processo já aquecido) ao último
+        "rss_growth_mb": rss[-1] - rss[0] if rss else None,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment_info():
+    return {
+        "git_commit": git_commit(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "opencv": cv2.__version__,
+        "opencv_threads": cv2.getNumThreads(),
+        "mediapipe": mp.__version__,
+        "numpy": np.__version__,
+    }
+
+
+def clip_info(clip_path):
+    cap = cv2.VideoCapture(clip_path)
+    info = {
+        "frames": int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
+        "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        "fps": cap.get(cv2.CAP_PROP_FPS),
+    }
+    cap.release()
+    return info
+
+
+def run_benchmark(clip_path, complexities=(0, 1, 2), models=(), inference_frames=100,
+                  display_size=(960, 540), warmup=5, startup_runs=5, log=print):
+    """Mede cada etapa sobre o vídeo e retorna um dicionário {etapa: estatísticas}."""
+    fps = clip_info(clip_path)["fps"] or 30
+    stages = {}
+
+    def record(name, bench, *args, discard=warmup):
+        log(f"{name}...")
+        try:
+            stages[name] = summarize(bench(*args), discard)
+        except Exception as error:
+            # Ex.: modelo heavy sem rede para o download; as demais etapas seguem
+            stages[name] = {"error": f"{type(error).__name__}: {error}"}
+
+    record("decode", bench_decode, clip_path)
+    record("cvt_color", bench_cvt_color, clip_path)
+
+    for model_complexity in complexities:
+        def bench_pose(model_complexity=model_complexity):
+            pose = create_pose(model_complexity=model_complexity)
+            try:
+                return bench_inference(clip_path, pose, inference_frames, fps)
+            finally:
+                pose.close()
+        record(f"inference_complexity_{model_complexity}", bench_pose)
+
+    for variant in models:
+        def bench_tasks(variant=variant):
+            pose = TasksPose(variant)
+            try:
+                return bench_inference(clip_path, pose, inference_frames, fps)
+            finally:
+                pose.close()
+        record(f"inference_landmarker_{variant}", bench_tasks)
+
+    analyses = create_analyses(list(ANALYSES))
+    record("landmarks_to_pixels", bench_landmark_conversion, clip_path, fps)
+    record("landmarks_to_pixels_required", bench_landmark_conversion, clip_path, fps,
+           AnalysisSet(analyses.values()).landmark_indexes)
+    for name, analysis in analyses.items():
+        record(f"process_frame_{name}", bench_analysis, clip_path, [analysis], fps)
+    record("process_frame_all", bench_analysis, clip_path, create_analyses(list(ANALYSES)).values(), fps)
+
+    record("overlays", bench_overlays, clip_path)
+    record("display", bench_display, clip_path, display_size)
+    record("display_legacy", bench_legacy_display, clip_path, display_size)
+    record("record", bench_recording, clip_path, fps)
+    record("record_inline", bench_inline_recording, clip_path, fps)
+
+    if startup_runs:
+        startup = []
+
+        def bench_startup(key):
+            if not startup:
+                startup.extend(measure_startup(startup_runs))
+            return [run[key] for run in startup]
+        # Cada execução é um processo novo: nenhuma medição é descartada
+        record("startup_window", bench_startup, "window", discard=0)
+        record("startup_ready", bench_startup, "ready", discard=0)
+    return stages
+
+
+def parse_size(value):
+    try:
+        width, height = (int(part) for part in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Tamanho inválido: {value} (use LARGURAxALTURA)")
+    return width, height
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark das etapas do processamento de frames.")
+    parser.add_argument("--clip", default=None,
+                        help="Vídeo a usar; sem ele, um vídeo sintético é gerado.")
+    parser.add_argument("--frames", type=int, default=300, help="Frames do vídeo sintético.")
+    parser.add_argument("--size", type=parse_size, default=(1280, 720),
+                        help="Resolução do vídeo sintético (padrão: 1280x720).")
+    parser.add_argument("--complexities", type=int, nargs="*", choices=(0, 1, 2), default=[0, 1, 2],
+                        help="Valores de model_complexity medidos (padrão: 0 1 2).")
+    parser.add_argument("--models", nargs="*", choices=MODEL_VARIANTS, default=None,
+                        help="Modelos .task medidos (padrão: os presentes em models/).")
+    parser.add_argument("--inference-frames", type=int, default=100,
+                        help="Frames usados em cada medição de inferência.")
+    parser.add_argument("--display-size", type=parse_size, default=(960, 540),
+                        help="Tamanho do QLabel na medição da exibição (padrão: 960x540).")
+    parser.add_argument("--warmup", type=int, default=5,
+                        help="Medições iniciais descartadas em cada etapa.")
+    parser.add_argument("--startup-runs", type=int, default=5,
+                        help="Aberturas da interface medidas, cada uma em um processo novo (0 desativa).")
+    parser.add_argument("--soak-hours", type=float, default=0,
+                        help="Em vez das etapas, simula uma sessão desta duração e mede a memória ao longo dela.")
+    parser.add_argument("--output", default="benchmark.json", help="Arquivo JSON de saída.")
+    return parser
+
+
+def print_table(stages):
+    print(f"{'etapa':<32}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'fps':>10}")
+    for name, stats in stages.items():
+        if "error" in stats:
+            print(f"{name:<32}  erro: {stats['error']}")
+        elif stats["samples"]:
+            print(f"{name:<32}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}"
+                  f"{stats['p99_ms']:>10.2f}{stats['throughput_fps']:>10.1f}")
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.soak_hours > 0:
+        return run_soak_report(args)
+    models = args.models
+    if models is None:
+        models = [variant for variant in MODEL_VARIANTS if os.path.exists(model_path(variant))]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        clip_path = args.clip
+        if clip_path is None:
+            clip_path = os.path.join(temp_dir, "synthetic.mp4")
+            print(f"Gerando vídeo sintético ({args.frames} frames, {args.size[0]}x{args.size[1]})...")
+            make_synthetic_clip(clip_path, args.frames, *args.size)
+
+        report = {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "environment": environment_info(),
+            "clip": dict(clip_info(clip_path), path=args.clip, synthetic=args.clip is None),
+            "settings": {
+                "inference_frames": args.inference_frames,
+                "display_size": list(args.display_size),
+                "warmup": args.warmup,
+                "startup_runs": args.startup_runs,
+            },
+            "stages": run_benchmark(clip_path, args.complexities, models, args.inference_frames,
+                                    args.display_size, args.warmup, args.startup_runs),
+        }
+
+    with open(args.output, "w", encoding="utf-8") as output:
+        json.dump(report, output, indent=2, ensure_ascii=False)
+    print_table(report["stages"])
+    print(f"Resultados gravados em {args.output}")
+    return 1 if any("error" in stats for stats in report["stages"].values()) else 0
+
+
+def run_soak_report(args):
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": environment_info(),
+        "soak": run_soak(args.soak_hours),
+    }
+    with open(args.output, "w", encoding="utf-8") as output:
+        json.dump(report, output, indent=2, ensure_ascii=False)
+    soak = report["soak"]
+    growth = soak["rss_growth_mb"]
+    growth_text = f"{growth:+.1f} MB do primeiro ao último checkpoint" if growth is not None else "indisponível"
+    print(f"{soak['frames']} frames simulados em {soak['elapsed_s']:.0f} s; memória residente: {growth_text}")
+    print(f"Resultados gravados em {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""Cache em disco dos landmarks de cada vídeo, para não repetir a inferência.
+
+Cada entrada é um diretório com:
+    landmarks.npy   array float32 (frames, 33, 4) com x, y, z e visibilidade (NaN sem detecção)
+    timestamps.npy  array float64 (frames,) com o tempo de cada frame em ms
+    meta.json       dimensões do vídeo e parâmetros do Pose
+
+A chave combina o hash do conteúdo do arquivo com os parâmetros do Pose, então
+trocar o modelo ou os limiares de confiança gera uma nova entrada.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+import cv2
+import numpy as np
+
+from instrumentation import NULL_INSTRUMENTATION
+from pose import NUM_LANDMARKS, ArrayResults, landmarks_to_array, run_pose
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "analisador-mecanica-corrida", "landmarks")
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """Calcula o SHA-256 do conteúdo de um arquivo."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class CachedLandmarks:
+    """Landmarks de um vídeo carregados do cache (mapeados em memória)."""
+
+    def __init__(self, landmarks, timestamps, meta):
+        self.landmarks = landmarks
+        self.timestamps = timestamps
+        self.width = meta["width"]
+        self.height = meta["height"]
+        self.meta = meta
+
+    def __len__(self):
+        return len(self.landmarks)
+
+    def results(self, index):
+        """Retorna o resultado do frame `index` no formato lido pelas análises."""
+        return ArrayResults(self.landmarks[index])
+
+
+class LandmarkCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def key_for(self, video_path, pose_params):
+        """Chave do vídeo: hash do conteúdo combinado com os parâmetros do Pose."""
+        params = json.dumps(pose_params, sort_keys=True)
+        return hashlib.sha256(f"{file_hash(video_path)}:{params}".encode()).hexdigest()
+
+    def load(self, key):
+        """Carrega uma entrada do cache, ou retorna None se ela não existir."""
+        entry_dir = os.path.join(self.cache_dir, key)
+        try:
+            with open(os.path.join(entry_dir, "meta.json"), encoding="utf-8") as file:
+                meta = json.load(file)
+            landmarks = np.load(os.path.join(entry_dir, "landmarks.npy"), mmap_mode="r")
+            timestamps = np.load(os.path.join(entry_dir, "timestamps.npy"), mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+        return CachedLandmarks(landmarks, timestamps, meta)
+
+    def save(self, key, landmarks, timestamps, meta):
+        """Grava uma entrada de forma atômica (diretório temporário renomeado ao final)."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(dir=self.cache_dir, prefix=".tmp-")
+        try:
+            np.save(os.path.join(tmp_dir, "landmarks.npy"), landmarks)
+            np.save(os.path.join(tmp_dir, "timestamps.npy"), timestamps)
+            with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as file:
+                json.dump(meta, file)
+            os.replace(tmp_dir, os.path.join(self.cache_dir, key))
+        except OSError:
+            # Outra execução pode ter gravado a mesma entrada primeiro
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+class LandmarkRecorder:
+    """Acumula os landmarks de cada frame para gravá-los no cache ao fim do vídeo."""
+
+    def __init__(self):
+        self.landmarks = []
+        self.timestamps = []
+
+    def add(self, results, timestamp_ms):
+        array = landmarks_to_array(results)
+        if array is None:
+            array = np.full((NUM_LANDMARKS, 4), np.nan, dtype=np.float32)
+        self.landmarks.append(array)
+        self.timestamps.append(timestamp_ms)
+
+    def save(self, cache, key, width, height, pose_params):
+        if not self.landmarks:
+            return
+        meta = {"width": width, "height": height, "frames": len(self.landmarks), "pose_params": pose_params}
+        cache.save(key, np.stack(self.landmarks), np.asarray(self.timestamps, dtype=np.float64), meta)
+
+
+class CachedPose:
+    """Entrega o resultado do Pose de cada frame, lendo do cache quando existe e gravando-o quando não.
+
+    Sem cache (câmeras ao vivo), apenas converte o frame e executa a inferência.
+    Com `video_path` em vez de `key`, a chave é calculada numa thread: o hash de
+    um vídeo grande leva segundos, e a reprodução não espera por ele. Até a chave
+    ficar pronta, os frames passam pela inferência (e são registrados para o
+    cache); se o vídeo já estiver no cache, a leitura segue dele a partir daí.
+    """
+
+    def __init__(self, pose, pose_params, cache=None, key=None, instrumentation=NULL_INSTRUMENTATION,
+                 video_path=None):
+        self.pose = pose
+        self.instrumentation = instrumentation
+        self.pose_params = pose_params
+        self.cache = cache
+        self.key = key
+        self.cached = cache.load(key) if cache is not None and key is not None else None
+        self.recorder = LandmarkRecorder() if cache is not None and self.cached is None else None
+        self.frame_index = 0
+        self.computed_key = None
+        self.key_thread = None
+        if cache is not None and key is None and video_path is not None:
+            self.key_thread = threading.Thread(target=self.compute_key, args=(video_path,),
+                                               name="chave-cache", daemon=True)
+            self.key_thread.start()
+
+    def compute_key(self, video_path):
+        try:
+            self.computed_key = self.cache.key_for(video_path, self.pose_params)
+        except OSError as error:
+            print(f"Erro ao calcular a chave do cache de {video_path}: {error}")
+
+    def resolve_key(self):
+        """Usa a chave calculada em segundo plano: lê do cache, se houver, ou segue registrando."""
+        self.key_thread.join()
+        self.key_thread = None
+        self.key = self.computed_key
+        if self.key is None:
+            self.recorder = None
+            return
+        self.cached = self.cache.load(self.key)
+        if self.cached is not None:
+            self.recorder = None
+
+    def process(self, frame, timestamp_ms):
+        """Retorna os landmarks de um frame BGR, sem inferência se ele estiver no cache."""
+        if self.key_thread is not None and not self.key_thread.is_alive():
+            self.resolve_key()
+        if self.cached is not None and self.frame_index < len(self.cached):
+            with self.instrumentation.stage("inference"):
+                results = self.cached.results(self.frame_index)
+        else:
+            with self.instrumentation.stage("convert"):
+                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            with self.instrumentation.stage("inference"):
+                results = run_pose(self.pose, frame_rgb, timestamp_ms)
+            if self.recorder is not None:
+                self.recorder.add(results, timestamp_ms)
+        self.frame_index += 1
+        return results
+
+    def save(self, width, height):
+        """Grava os landmarks de um vídeo processado até o fim."""
+        if self.key_thread is not None:
+            self.resolve_key()
+        if self.recorder is not None:
+            self.recorder.save(self.cache, self.key, width, height, self.pose_params)
+            self.recorder = None
@@ -0,0 +1,194 @@
+"""Câmeras: descoberta em segundo plano e captura com baixa latência.
+
+Com as configurações padrão do cv2.VideoCapture, muitas câmeras USB entregam
+YUYV sem compressão (limitado pela banda do USB a poucos fps em resoluções
+altas) e o buffer interno do OpenCV acumula vários frames de atraso. O
+CameraSource negocia um formato comprimido (MJPG), a resolução e o fps pedidos
+e um buffer mínimo, e lê a câmera continuamente numa thread: quem consome
+recebe sempre o frame mais recente, com o instante da captura.
+"""
+import threading
+import time
+from collections import deque
+
+import cv2
+from PyQt5.QtCore import QObject, pyqtSignal
+
+# Índices testados na descoberta
+MAX_CAMERA_INDEX = 10
+
+# Formatos tentados, em ordem de preferência, antes do padrão da câmera
+PREFERRED_FOURCCS = ("MJPG", "H264")
+
+# Modos oferecidos na interface: (largura, altura, fps)
+CAMERA_MODES = ((640, 480, 30), (1280, 720, 30), (1280, 720, 60), (1920, 1080, 30), (1920, 1080, 60))
+DEFAULT_CAMERA_MODE = (1280, 720, 60)
+
+
+class CameraDiscovery(QObject):
+    """Testa os índices de câmera numa thread, sem travar a janela.
+
+    Abrir um índice sem dispositivo pode demorar bastante, então cada câmera
+    encontrada é anunciada por `camera_found` assim que responde, e `finished`
+    traz a lista completa ao fim da busca. Os sinais chegam à thread da GUI.
+    """
+
+    camera_found = pyqtSignal(int)
+    finished = pyqtSignal(list)
+
+    def __init__(self, max_index=MAX_CAMERA_INDEX, parent=None):
+        super().__init__(parent)
+        self.max_index = max_index
+        self.thread = threading.Thread(target=self.run, name="cameras", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def run(self):
+        available_cameras = []
+        for index in range(self.max_index):
+            cap = cv2.VideoCapture(index)
+            found = cap.read()[0]
+            cap.release()
+            if found:
+                available_cameras.append(index)
+                self.camera_found.emit(index)
+        self.finished.emit(available_cameras)
+
+
+def fourcc_to_text(value):
+    value = int(value)
+    return "".join(chr((value >> (8 * shift)) & 0xFF) for shift in range(4)).strip("\0 ") or "?"
+
+
+def negotiate(cap, width, height, fps, fourccs=PREFERRED_FOURCCS, buffer_size=1):
+    """Pede formato, resolução, fps e tamanho do buffer e retorna o que a câmera aceitou.
+
+    O formato vem antes da resolução: no V4L2, as resoluções e taxas disponíveis
+    dependem dele.
+    """
+    for fourcc in fourccs:
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+        if fourcc_to_text(cap.get(cv2.CAP_PROP_FOURCC)) == fourcc:
+            break
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    cap.set(cv2.CAP_PROP_FPS, fps)
+    # Nem todo backend aceita; o frame mais recente é garantido pela thread de leitura
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+    return {
+        "fourcc": fourcc_to_text(cap.get(cv2.CAP_PROP_FOURCC)),
+        "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        "fps": cap.get(cv2.CAP_PROP_FPS),
+        "buffer_size": int(cap.get(cv2.CAP_PROP_BUFFERSIZE)),
+    }
+
+
+class CameraSource:
+    """Câmera lida continuamente numa thread, no lugar do cv2.VideoCapture.
+
+    `read` entrega o frame mais recente ainda não lido, esperando o próximo se
+    necessário; frames que chegam antes de serem lidos são descartados (e
+    contados em `dropped`). `capture_timestamp_ms` é o instante, no relógio
+    monotônico, em que o frame lido foi capturado: o timestamp do driver
+    quando ele existe (V4L2) ou o fim da leitura. Como no VideoCapture, o array
+    passado a `read` é reaproveitado como destino de uma próxima leitura.
+    """
+
+    def __init__(self, index, width=1280, height=720, fps=60, fourccs=PREFERRED_FOURCCS, buffer_size=1,
+                 read_timeout=2.0):
+        self.cap = cv2.VideoCapture(index)
+        self.settings = negotiate(self.cap, width, height, fps, fourccs, buffer_size) if self.cap.isOpened() else {}
+        self.read_timeout = read_timeout
+
+        self.condition = threading.Condition()
+        self.frame = None
+        self.timestamp_ms = None
+        self.sequence = 0
+        self.read_sequence = 0
+        self.spare = None
+        self.stopped = False
+        self.capture_timestamp_ms = None
+
+        self.dropped = 0
+        self.grab_times = deque(maxlen=60)
+        self.thread = threading.Thread(target=self.grab_loop, name="camera", daemon=True)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def start(self):
+        self.thread.start()
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_POS_MSEC:
+            return self.capture_timestamp_ms or 0.0
+        return self.cap.get(prop)
+
+    def frame_timestamp(self, read_ms):
+        """Timestamp do driver, se for do relógio monotônico e recente; senão, o fim da leitura."""
+        driver_ms = self.cap.get(cv2.CAP_PROP_POS_MSEC)
+        if 0 <= read_ms - driver_ms < 1000:
+            return driver_ms
+        return read_ms
+
+    def grab_loop(self):
+        while not self.stopped:
+            with self.condition:
+                buffer, self.spare = self.spare, None
+            ret, frame = self.cap.read(buffer)
+            read_ms = time.monotonic() * 1000
+            with self.condition:
+                if not ret:
+                    self.stopped = True
+                    self.condition.notify_all()
+                    return
+                if self.sequence > self.read_sequence:
+                    # O frame anterior não foi lido: é descartado, e seu array reaproveitado
+                    self.dropped += 1
+                    self.spare = self.frame
+                self.frame = frame
+                self.timestamp_ms = self.frame_timestamp(read_ms)
+                self.sequence += 1
+                self.grab_times.append(read_ms)
+                self.condition.notify_all()
+
+    def read(self, image=None):
+        with self.condition:
+            if image is not None and image is not self.frame:
+                self.spare = image
+            self.condition.wait_for(lambda: self.sequence > self.read_sequence or self.stopped, self.read_timeout)
+            if self.sequence == self.read_sequence:
+                return False, None
+            self.read_sequence = self.sequence
+            self.capture_timestamp_ms = self.timestamp_ms
+            return True, self.frame
+
+    @property
+    def fps(self):
+        """Taxa real de captura, sobre os últimos frames lidos da câmera."""
+        with self.condition:
+            if len(self.grab_times) < 2:
+                return 0.0
+            elapsed_ms = self.grab_times[-1] - self.grab_times[0]
+            frames = len(self.grab_times) - 1
+        return frames * 1000 / elapsed_ms if elapsed_ms > 0 else 0.0
+
+    def status_text(self):
+        settings = self.settings
+        return (f"Câmera {settings.get('fourcc', '?')} {settings.get('width', 0)}x{settings.get('height', 0)}: "
+                f"{self.fps:.1f} fps, {self.dropped} descartados")
+
+    def draw_overlay(self, annotated_frame):
+        """Escreve o formato negociado, o fps real e os frames descartados."""
+        cv2.putText(annotated_frame, self.status_text(), (10, annotated_frame.shape[0] - 65),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
+
+    def release(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+        if self.thread.is_alive():
+            self.thread.join()
+        self.cap.release()
@@ -0,0 +1,81 @@
+"""Exibição dos frames do OpenCV no Qt.
+
+O frame anotado (BGR) é reduzido uma única vez pelo cv2.resize para o tamanho
+do QLabel e entregue ao Qt como QImage no formato BGR888, que aponta para os
+dados do array: sem cópia do frame, sem conversão BGR→RGB e sem o `scaled()`
+do Qt. A única cópia restante é a do QPixmap.
+"""
+import cv2
+from PyQt5.QtCore import QEvent, QObject
+from PyQt5.QtGui import QImage, QPixmap
+
+
+def bgr_to_qimage(image):
+    """QImage sobre os dados BGR do array, sem cópia: o array precisa existir enquanto o QImage for usado."""
+    height, width = image.shape[:2]
+    return QImage(image.data, width, height, image.strides[0], QImage.Format_BGR888)
+
+
+class FrameDisplay(QObject):
+    """Mostra frames BGR em um QLabel, no tamanho do widget e mantendo a proporção.
+
+    O tamanho de destino só muda quando o QLabel é redimensionado (evento de
+    resize), e o tamanho do frame reduzido é calculado uma vez para cada
+    combinação de frame e destino. `fit` pode rodar fora da thread da GUI;
+    `show` e `show_fitted` só na thread da GUI. Sem `label` (ex.: no benchmark),
+    o tamanho de destino é definido por `resize`.
+    """
+
+    def __init__(self, label=None, interpolation=cv2.INTER_LINEAR):
+        super().__init__(label)
+        self.label = label
+        self.interpolation = interpolation
+        self.target_size = (1, 1)
+        # (tamanho do frame, tamanho de destino, tamanho reduzido) da última conta
+        self.fitted = (None, None, None)
+        # Destino reaproveitado do redimensionamento na thread da GUI
+        self.buffer = None
+        if label is not None:
+            self.resize(label.width(), label.height())
+            label.installEventFilter(self)
+
+    def resize(self, width, height):
+        self.target_size = (max(width, 1), max(height, 1))
+
+    def eventFilter(self, watched, event):
+        if watched is self.label and event.type() == QEvent.Resize:
+            self.resize(event.size().width(), event.size().height())
+        return False
+
+    def fitted_size(self, width, height):
+        """Maior tamanho com a proporção do frame que cabe no QLabel."""
+        target_size = self.target_size
+        frame_size, cached_target, fitted = self.fitted
+        if frame_size == (width, height) and cached_target == target_size:
+            return fitted
+        scale = min(target_size[0] / width, target_size[1] / height)
+        fitted = (max(round(width * scale), 1), max(round(height * scale), 1))
+        self.fitted = ((width, height), target_size, fitted)
+        return fitted
+
+    def fit(self, frame, dst=None):
+        """Reduz o frame ao tamanho de exibição; se ele já tiver esse tamanho, é retornado como está."""
+        height, width = frame.shape[:2]
+        size = self.fitted_size(width, height)
+        if size == (width, height):
+            return frame
+        # INTER_AREA seria mais suave, mas é várias vezes mais lento em escalas não inteiras (ex.: 720p → 540p)
+        if dst is not None and dst.shape[:2] != (size[1], size[0]):
+            dst = None
+        return cv2.resize(frame, size, dst=dst, interpolation=self.interpolation)
+
+    def show(self, frame):
+        """Reduz o frame no buffer reaproveitado e o exibe no QLabel."""
+        image = self.fit(frame, self.buffer)
+        if image is not frame:
+            self.buffer = image
+        self.show_fitted(image)
+
+    def show_fitted(self, image):
+        """Exibe um frame já reduzido por `fit`, como os que chegam do pipeline."""
+        self.label.setPixmap(QPixmap.fromImage(bgr_to_qimage(image)))
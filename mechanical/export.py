@@ -0,0 +1,157 @@
+"""Exportação contínua dos valores que as análises calculam a cada frame.
+
+Cada análise declara os campos que produz por frame (`EXPORT_FIELDS`, com o
+dtype de cada um) e entrega os valores do último frame em `export_record()`.
+O FrameExporter guarda as linhas em colunas pré-alocadas e, a cada
+`batch_rows` linhas, entrega o lote a uma thread que o grava: em Parquet (um
+row group por lote) quando o pyarrow está instalado, ou em CSV. O pyarrow só é
+importado ao criar o arquivo Parquet, para não pesar na abertura da interface. A memória fica
+limitada a poucos lotes, qualquer que seja a duração da sessão, e o loop de
+frames da interface nunca espera pelo disco: se a gravação atrasar além da
+fila, o lote é descartado e contado.
+"""
+import importlib.util
+import os
+import queue
+import threading
+
+import numpy as np
+
+DEFAULT_EXPORT_DIR = os.path.join(os.path.expanduser("~"), "analisador-mecanica-corrida", "exportacoes")
+
+# Marca o fim da sessão na fila de gravação
+END_OF_EXPORT = object()
+
+
+def export_path(directory, name):
+    """Caminho do arquivo de exportação: Parquet com o pyarrow instalado, senão CSV."""
+    # Opcional: sem o pyarrow, a exportação é feita em CSV
+    extension = ".parquet" if importlib.util.find_spec("pyarrow") is not None else ".csv"
+    return os.path.join(directory, name + extension)
+
+
+class ParquetBatchWriter:
+    def __init__(self, path, fields):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self.pa = pa
+        self.schema = pa.schema([(name, pa.from_numpy_dtype(np.dtype(dtype))) for name, dtype in fields])
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, columns):
+        self.writer.write_table(self.pa.table(columns, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+class CsvBatchWriter:
+    def __init__(self, path, fields):
+        self.file = open(path, "w", encoding="utf-8")
+        self.file.write(",".join(name for name, _ in fields) + "\n")
+        # Cada linha é formatada de uma vez, o que também devolve o GIL à thread de frames entre uma
+        # linha e outra
+        self.row_format = ",".join(self.column_format(dtype) for _, dtype in fields) + "\n"
+
+    @staticmethod
+    def column_format(dtype):
+        """float32 com a sua precisão (7 dígitos); float64 (ex.: timestamp) com todos os dígitos, pelo repr."""
+        dtype = np.dtype(dtype)
+        if dtype.kind != "f":
+            return "%d"
+        return "%.7g" if dtype.itemsize <= 4 else "%r"
+
+    def write(self, columns):
+        rows = zip(*(column.tolist() for column in columns.values()))
+        self.file.writelines(self.row_format % row for row in rows)
+
+    def close(self):
+        self.file.close()
+
+
+class FrameExporter:
+    """Recebe uma linha por frame das análises e a grava em lotes numa thread.
+
+    Cada linha traz o timestamp, se houve detecção e os campos de cada análise,
+    com o nome prefixado pelo `EXPORT_NAME` dela. Nos frames sem detecção, os
+    campos das análises ficam NaN (ou 0 nos inteiros). Com `blocking` (modo em
+    lote, sem interface), o loop espera pela gravação em vez de descartar lotes.
+    """
+
+    def __init__(self, path, analyses, batch_rows=4096, max_pending_batches=4, blocking=False):
+        self.path = path
+        self.blocking = blocking
+        self.analyses = list(analyses)
+        self.batch_rows = batch_rows
+        self.fields = [("timestamp_ms", "float64"), ("detected", "bool")]
+        for analysis in self.analyses:
+            self.fields += [(f"{analysis.EXPORT_NAME}_{name}", dtype) for name, dtype in analysis.EXPORT_FIELDS]
+        self.missing = [np.nan if np.dtype(dtype).kind == "f" else 0 for _, dtype in self.fields]
+
+        self.columns = self.new_batch()
+        self.rows = 0
+        self.total_rows = 0
+        self.dropped_rows = 0
+        self.error = None
+
+        writer_class = ParquetBatchWriter if path.endswith(".parquet") else CsvBatchWriter
+        self.writer = writer_class(path, self.fields)
+        self.queue = queue.Queue(maxsize=max_pending_batches)
+        self.thread = threading.Thread(target=self.write_loop, name="exportacao", daemon=True)
+        self.thread.start()
+
+    def new_batch(self):
+        return [np.empty(self.batch_rows, dtype=dtype) for _, dtype in self.fields]
+
+    def add(self, timestamp_ms, detected):
+        """Registra o frame atual; chamado depois de todas as análises processarem o frame."""
+        row = self.rows
+        columns = self.columns
+        columns[0][row] = timestamp_ms
+        columns[1][row] = detected
+        index = 2
+        for analysis in self.analyses:
+            values = analysis.export_record() if detected else self.missing[index:index + len(analysis.EXPORT_FIELDS)]
+            for value in values:
+                columns[index][row] = value
+                index += 1
+        self.rows += 1
+        if self.rows == self.batch_rows:
+            self.submit(self.blocking)
+
+    def submit(self, block=False):
+        """Entrega o lote atual à thread de gravação; no loop de frames, sem esperar por ela."""
+        if self.rows == 0:
+            return
+        batch = {name: column[:self.rows] for (name, _), column in zip(self.fields, self.columns)}
+        try:
+            self.queue.put(batch, block=block)
+            self.total_rows += self.rows
+            self.columns = self.new_batch()
+        except queue.Full:
+            # Disco atrasado: o lote é perdido, mas o loop de frames não trava (as colunas são reaproveitadas)
+            self.dropped_rows += self.rows
+        self.rows = 0
+
+    def write_loop(self):
+        while True:
+            batch = self.queue.get()
+            if batch is END_OF_EXPORT:
+                return
+            if self.error is not None:
+                continue
+            try:
+                self.writer.write(batch)
+            except (OSError, ValueError) as error:
+                # Os lotes seguintes são descartados, mas a fila continua sendo esvaziada
+                self.error = error
+                print(f"Erro ao gravar a exportação em {self.path}: {error}")
+
+    def close(self):
+        """Grava o lote parcial, aguarda a fila e fecha o arquivo."""
+        self.submit(block=True)
+        self.queue.put(END_OF_EXPORT)
+        self.thread.join()
+        self.writer.close()
+        if self.dropped_rows:
+            print(f"Exportação: {self.dropped_rows} linhas descartadas porque a gravação atrasou")
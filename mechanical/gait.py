@@ -0,0 +1,213 @@
+"""Detecção offline dos eventos da marcha sobre as séries completas de landmarks.
+
+Em vez de decidir o contato frame a frame, como a StrideAnalysis, recebe as
+trajetórias inteiras de calcanhar e ponta do pé de um vídeo gravado (por
+exemplo, os arrays do cache de landmarks) e detecta, em operações vetorizadas:
+
+- o ponto mais baixo de cada pé em cada frame, suavizado por um filtro gaussiano;
+- os apoios, como trechos em que o pé fica na faixa do solo e que contêm um
+  cruzamento por zero da velocidade vertical (o pé para de descer);
+- o contato inicial e a retirada do pé, interpolados entre frames no instante
+  em que o pé entra e sai da faixa do solo;
+- o tipo de pisada, comparando calcanhar e ponta do pé no contato inicial.
+"""
+import numpy as np
+
+from pose import mp_pose
+
+# Calcanhar e ponta do pé de cada lado (esquerdo, direito)
+HEEL_LANDMARKS = (mp_pose.PoseLandmark.LEFT_HEEL, mp_pose.PoseLandmark.RIGHT_HEEL)
+TOE_LANDMARKS = (mp_pose.PoseLandmark.LEFT_FOOT_INDEX, mp_pose.PoseLandmark.RIGHT_FOOT_INDEX)
+
+# Tipos de pisada, com os mesmos nomes da StrideAnalysis
+STRIKE_NAMES = {1: "calcanhar", 2: "meio_do_pe", 3: "antepe"}
+
+
+def fill_gaps(signal, times, max_gap_ms):
+    """Interpola os frames sem detecção (NaN); lacunas maiores que `max_gap_ms` ficam inválidas.
+
+    Retorna o sinal preenchido e a máscara dos frames válidos.
+    """
+    missing = np.isnan(signal)
+    if missing.all():
+        return np.zeros_like(signal), np.zeros(len(signal), dtype=bool)
+    filled = signal.copy()
+    filled[missing] = np.interp(times[missing], times[~missing], signal[~missing])
+
+    # Duração de cada lacuna, entre o último frame válido antes dela e o primeiro depois
+    edges = np.diff(missing.astype(np.int8), prepend=0, append=0)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    before = times[np.maximum(starts - 1, 0)]
+    after = times[np.minimum(ends, len(times) - 1)]
+    long_gaps = after - before > max_gap_ms
+    valid = np.ones(len(signal), dtype=bool)
+    for start, end in zip(starts[long_gaps], ends[long_gaps]):
+        valid[start:end] = False
+    return filled, valid
+
+
+def smooth(signal, sigma_frames):
+    """Filtro gaussiano com bordas replicadas."""
+    if sigma_frames < 0.5:
+        return signal
+    radius = int(3 * sigma_frames)
+    offsets = np.arange(-radius, radius + 1)
+    kernel = np.exp(-0.5 * (offsets / sigma_frames) ** 2)
+    kernel /= kernel.sum()
+    padded = np.pad(signal, radius, mode="edge")
+    return np.convolve(padded, kernel, mode="valid")
+
+
+def crossing_times(times, signal, level, after_indices):
+    """Instante, interpolado entre os frames i - 1 e i, em que o sinal cruza `level`."""
+    before_indices = after_indices - 1
+    y0 = signal[before_indices]
+    y1 = signal[after_indices]
+    fraction = np.clip((level - y0) / np.where(y1 != y0, y1 - y0, 1.0), 0.0, 1.0)
+    return times[before_indices] + fraction * (times[after_indices] - times[before_indices])
+
+
+def summarize_values(values):
+    """Mesmo formato do RunningStats.summary, calculado de uma vez sobre um array."""
+    values = np.asarray(values, dtype=np.float64)
+    if values.size == 0:
+        return {"count": 0, "mean": None, "std": None, "min": None, "max": None}
+    return {
+        "count": int(values.size),
+        "mean": float(values.mean()),
+        "std": float(values.std()),
+        "min": float(values.min()),
+        "max": float(values.max()),
+    }
+
+
+def detect_gait_events(landmarks, timestamps_ms, width, height, smoothing_ms=25, contact_fraction=0.15,
+                       min_contact_ms=40, min_step_ms=150, max_gap_ms=100, strike_margin=0.1):
+    """Detecta os apoios de um vídeo inteiro.
+
+    `landmarks` é o array (frames, 33, 4) normalizado do cache (NaN nos frames
+    sem detecção) e `timestamps_ms` o tempo de cada frame. Retorna um dicionário
+    de arrays, um elemento por apoio em ordem cronológica: `foot` (0 esquerdo,
+    1 direito), `contact_ms`, `toe_off_ms` e `strike` (1 calcanhar, 2 meio do
+    pé, 3 antepé).
+
+    Frames cujo timestamp não avança (repetido ou para trás, como em gravações
+    de celular com taxa de quadros variável) são descartados.
+    """
+    times = np.asarray(timestamps_ms, dtype=np.float64)
+    if len(times) > 1:
+        # Cada frame precisa ser posterior a todos os anteriores mantidos
+        keep = np.ones(len(times), dtype=bool)
+        keep[1:] = times[1:] > np.maximum.accumulate(times)[:-1]
+        if not keep.all():
+            if np.count_nonzero(keep) < 2:
+                raise ValueError("Os timestamps dos frames precisam ser crescentes")
+            times = times[keep]
+            landmarks = landmarks[keep]
+    frame_ms = np.median(np.diff(times)) if len(times) > 1 else 1.0
+
+    # (2 pés, frames): y em pixels, crescendo para baixo
+    heel_y = np.asarray(landmarks[:, HEEL_LANDMARKS, 1], dtype=np.float64).T * height
+    toe_y = np.asarray(landmarks[:, TOE_LANDMARKS, 1], dtype=np.float64).T * height
+    heel_x = np.asarray(landmarks[:, HEEL_LANDMARKS, 0], dtype=np.float64).T * width
+    toe_x = np.asarray(landmarks[:, TOE_LANDMARKS, 0], dtype=np.float64).T * width
+
+    sigma_frames = smoothing_ms / frame_ms
+    tracks = []
+    for foot in range(2):
+        heel, heel_valid = fill_gaps(heel_y[foot], times, max_gap_ms)
+        toe, toe_valid = fill_gaps(toe_y[foot], times, max_gap_ms)
+        heel = smooth(heel, sigma_frames)
+        toe = smooth(toe, sigma_frames)
+        # Ponto mais baixo do pé em cada frame
+        tracks.append((heel, toe, np.maximum(heel, toe), heel_valid & toe_valid))
+
+    # Faixa do solo comum aos dois pés (mesma esteira)
+    lowest = np.concatenate([foot_y[valid] for _, _, foot_y, valid in tracks])
+    empty = {"foot": np.zeros(0, dtype=np.int8), "contact_ms": np.zeros(0), "toe_off_ms": np.zeros(0),
+             "strike": np.zeros(0, dtype=np.int8)}
+    if lowest.size < 3:
+        return empty
+    ground = np.percentile(lowest, 95)
+    top = np.percentile(lowest, 5)
+    level = ground - contact_fraction * (ground - top)
+
+    feet, contacts, toe_offs, strikes = [], [], [], []
+    for foot, (heel, toe, foot_y, valid) in enumerate(tracks):
+        on_ground = (foot_y >= level) & valid
+
+        # Trechos contínuos no solo; os cortados pelo início ou fim do vídeo são descartados
+        edges = np.diff(on_ground.astype(np.int8), prepend=0, append=0)
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        complete = (starts > 0) & (ends < len(times))
+        starts, ends = starts[complete], ends[complete]
+        if starts.size == 0:
+            continue
+
+        # Cruzamentos por zero da velocidade vertical: o pé para de descer
+        velocity = np.gradient(foot_y, times)
+        stops = np.flatnonzero((velocity[:-1] > 0) & (velocity[1:] <= 0)) + 1
+        run = np.searchsorted(starts, stops, side="right") - 1
+        inside = (run >= 0) & (stops < ends[np.maximum(run, 0)])
+        has_stop = np.zeros(starts.size, dtype=bool)
+        has_stop[run[inside]] = True
+
+        contact = crossing_times(times, foot_y, level, starts)
+        toe_off = crossing_times(times, foot_y, level, ends)
+        keep = has_stop & (toe_off - contact >= min_contact_ms)
+        contact, toe_off = contact[keep], toe_off[keep]
+
+        # Tipo de pisada: qual parte do pé está mais baixa no contato inicial
+        foot_length = np.nanmedian(np.hypot(heel_x[foot] - toe_x[foot], heel_y[foot] - toe_y[foot]))
+        margin = strike_margin * (foot_length if np.isfinite(foot_length) else 0.0)
+        heel_down = np.interp(contact, times, heel) - np.interp(contact, times, toe)
+        strike = np.where(heel_down > margin, 1, np.where(heel_down < -margin, 3, 2)).astype(np.int8)
+
+        feet.append(np.full(contact.size, foot, dtype=np.int8))
+        contacts.append(contact)
+        toe_offs.append(toe_off)
+        strikes.append(strike)
+
+    if not contacts:
+        return empty
+    foot = np.concatenate(feet)
+    contact = np.concatenate(contacts)
+    toe_off = np.concatenate(toe_offs)
+    strike = np.concatenate(strikes)
+    order = np.argsort(contact, kind="stable")
+    foot, contact, toe_off, strike = foot[order], contact[order], toe_off[order], strike[order]
+
+    # Contatos quase simultâneos vêm de pés trocados pelo modelo; fica o primeiro
+    distinct = np.concatenate(([True], np.diff(contact) >= min_step_ms))
+    return {"foot": foot[distinct], "contact_ms": contact[distinct], "toe_off_ms": toe_off[distinct],
+            "strike": strike[distinct]}
+
+
+def analyze_gait(landmarks, timestamps_ms, width, height, treadmill_speed=0, **params):
+    """Cadência, tempos de contato e de voo e tipos de pisada de um vídeo inteiro."""
+    events = detect_gait_events(landmarks, timestamps_ms, width, height, **params)
+    contact = events["contact_ms"]
+    step_times = np.diff(contact)
+    # Mediana: um passo perdido dobra um intervalo, mas quase não a altera
+    cadence = 60000 / np.median(step_times) if step_times.size else 0.0
+
+    stride_length = 0.0
+    if cadence > 0:
+        # Mesma conta da StrideAnalysis: velocidade da esteira dividida pela cadência
+        stride_length = (treadmill_speed / 3.6) / (cadence / 60) * 100
+
+    strike_counts = {name: int(np.count_nonzero(events["strike"] == strike_type))
+                     for strike_type, name in STRIKE_NAMES.items()}
+    return {
+        "steps": int(contact.size),
+        "cadence_spm": float(cadence),
+        "speed_kmh": float(treadmill_speed),
+        "stride_length_cm": float(stride_length),
+        "step_time_ms": summarize_values(step_times),
+        "contact_time_ms": summarize_values(events["toe_off_ms"] - contact),
+        # Da retirada de um pé ao contato seguinte (negativo indica apoio duplo)
+        "flight_time_ms": summarize_values(contact[1:] - events["toe_off_ms"][:-1]),
+        "strike_counts": strike_counts,
+    }
@@ -0,0 +1,209 @@
+"""Histórico de sessões longas com memória fixa e resolução decrescente com a idade.
+
+As amostras mais recentes ficam como foram medidas; as mais antigas, em blocos
+com início, fim, número de amostras, mínimo, máximo e média de cada série. Cada nível é um
+RingBuffer alocado na criação; o último nunca descarta nada: quando enche,
+junta os blocos dois a dois e dobra o tamanho deles. Assim, o histórico sempre
+cobre a sessão inteira (para os gráficos mostrarem a sessão toda) e a memória
+não cresce com a duração da sessão.
+
+A análise acrescenta amostras na thread do pipeline enquanto a GUI lê o
+histórico: as duas coisas são feitas sob um lock, e a leitura devolve cópias.
+"""
+import threading
+
+import numpy as np
+
+from utils import RingBuffer
+
+
+class BucketTier:
+    """Nível de blocos de `bucket_size` amostras, num buffer circular de `capacity` blocos.
+
+    Linhas do buffer: início e fim do bloco (ms), número de amostras e, para
+    cada série, mínimo, máximo e média. Com `compact`, em vez de descartar o bloco mais antigo, o
+    nível junta os blocos dois a dois quando enche.
+    """
+
+    def __init__(self, n_series, bucket_size, capacity, compact=False):
+        self.n_series = n_series
+        self.initial_bucket_size = bucket_size
+        self.bucket_size = bucket_size
+        self.compact = compact
+        self.buckets = RingBuffer(capacity, 3 + 3 * n_series)
+        self.dropped = False
+        # Bloco em formação
+        self.count = 0
+        self.first_ms = 0.0
+        self.last_ms = 0.0
+        self.minimum = np.empty(n_series)
+        self.maximum = np.empty(n_series)
+        self.total = np.empty(n_series)
+        self.column = np.empty(3 + 3 * n_series)
+
+    def add(self, timestamp_ms, values):
+        if self.count == 0:
+            self.first_ms = timestamp_ms
+            self.minimum[:] = values
+            self.maximum[:] = values
+            self.total[:] = values
+        else:
+            np.minimum(self.minimum, values, out=self.minimum)
+            np.maximum(self.maximum, values, out=self.maximum)
+            self.total += values
+        self.last_ms = timestamp_ms
+        self.count += 1
+        if self.count == self.bucket_size:
+            self.close_bucket()
+
+    def pending_column(self):
+        """Bloco em formação no formato das colunas do buffer."""
+        n = self.n_series
+        column = self.column
+        column[0] = self.first_ms
+        column[1] = self.last_ms
+        column[2] = self.count
+        column[3:3 + n] = self.minimum
+        column[3 + n:3 + 2 * n] = self.maximum
+        column[3 + 2 * n:] = self.total / self.count
+        return column
+
+    def close_bucket(self):
+        if len(self.buckets) == self.buckets.capacity:
+            if self.compact:
+                self.merge_pairs()
+            else:
+                self.dropped = True
+        self.buckets.append(self.pending_column())
+        self.count = 0
+
+    def merge_pairs(self):
+        """Junta os blocos dois a dois: metade dos blocos, cada um com o dobro das amostras.
+
+        As médias são ponderadas pelo número de amostras de cada bloco, que pode
+        diferir (bloco fechado antes de uma junção, bloco que sobrou sozinho).
+        """
+        n = self.n_series
+        buckets = self.buckets.view()
+        # Com capacidade ímpar, o último bloco segue sozinho
+        leftover = buckets[:, -1].copy() if buckets.shape[1] % 2 else None
+        pairs = buckets[:, :buckets.shape[1] // 2 * 2].reshape(buckets.shape[0], -1, 2)
+        counts = pairs[2]
+        merged = np.empty(pairs.shape[:2])
+        merged[0] = pairs[0, :, 0]
+        merged[1] = pairs[1, :, 1]
+        merged[2] = counts.sum(axis=1)
+        merged[3:3 + n] = pairs[3:3 + n].min(axis=2)
+        merged[3 + n:3 + 2 * n] = pairs[3 + n:3 + 2 * n].max(axis=2)
+        merged[3 + 2 * n:] = (pairs[3 + 2 * n:] * counts).sum(axis=2) / merged[2]
+        self.buckets.clear()
+        for column in merged.T:
+            self.buckets.append(column)
+        if leftover is not None:
+            self.buckets.append(leftover)
+        self.bucket_size *= 2
+
+    def covers(self, start_ms):
+        """Se o nível ainda tem as amostras desde `start_ms` (None: desde o início da sessão)."""
+        if self.compact or not self.dropped:
+            return True
+        return start_ms is not None and self.buckets.view()[0, 0] <= start_ms
+
+    def columns(self):
+        """Cópia dos blocos fechados e do bloco em formação, como um array (linhas, blocos)."""
+        buckets = self.buckets.view()
+        if self.count == 0:
+            return buckets.copy()
+        return np.concatenate([buckets, self.pending_column()[:, None]], axis=1)
+
+
+class TieredHistory:
+    """Histórico de `n_series` séries: `recent` amostras completas e níveis de blocos.
+
+    `bucket_sizes` define os níveis (em amostras por bloco), cada um com
+    `buckets` blocos; o último compacta em vez de descartar. Com os padrões, a
+    30 fps: ~1 min completo, ~18 min em blocos de 0,5 s e a sessão inteira em
+    blocos de 8,5 s ou mais.
+    """
+
+    def __init__(self, n_series, recent=2048, bucket_sizes=(16, 256), buckets=2048):
+        self.n_series = n_series
+        # Linha 0: timestamp (ms); demais: uma por série
+        self.recent = RingBuffer(recent, 1 + n_series)
+        self.tiers = [
+            BucketTier(n_series, bucket_size, buckets, compact=index == len(bucket_sizes) - 1)
+            for index, bucket_size in enumerate(bucket_sizes)
+        ]
+        self.samples = 0
+        self.first_ms = None
+        self.row = np.empty(1 + n_series)
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return self.samples
+
+    @property
+    def nbytes(self):
+        """Memória alocada pelo histórico, fixa desde a criação."""
+        return self.recent.data.nbytes + sum(tier.buckets.data.nbytes for tier in self.tiers)
+
+    def append(self, timestamp_ms, values):
+        """Adiciona uma amostra (um valor por série) com o seu timestamp."""
+        with self.lock:
+            if self.first_ms is None:
+                self.first_ms = timestamp_ms
+            self.row[0] = timestamp_ms
+            self.row[1:] = values
+            self.recent.append(self.row)
+            for tier in self.tiers:
+                tier.add(timestamp_ms, self.row[1:])
+            self.samples += 1
+
+    def last(self, count):
+        """Cópia das últimas `count` amostras (no máximo as guardadas completas): (timestamps, valores por série)."""
+        with self.lock:
+            last = self.recent.view()[:, -count:].copy()
+        return last[0], last[1:]
+
+    def window(self, start_ms=None):
+        """Retorna (timestamps, médias, mínimos, máximos) desde `start_ms` (None: a sessão inteira).
+
+        Usa o nível mais fino que ainda tem o intervalo inteiro; nas amostras
+        completas, média, mínimo e máximo são o próprio valor. Os timestamps dos
+        blocos são o meio de cada bloco. Os arrays são cópias.
+        """
+        with self.lock:
+            recent = self.recent.view()
+            complete = self.samples == len(self.recent)
+            if complete or (start_ms is not None and len(self.recent) and recent[0, 0] <= start_ms):
+                first = 0 if start_ms is None else int(np.searchsorted(recent[0], start_ms))
+                recent = recent[:, first:].copy()
+                values = recent[1:]
+                return recent[0], values, values, values
+            tier = next(tier for tier in self.tiers if tier.covers(start_ms))
+            columns = tier.columns()
+        n = self.n_series
+        if start_ms is not None:
+            columns = columns[:, np.searchsorted(columns[1], start_ms):]
+        times = (columns[0] + columns[1]) / 2
+        return times, columns[3 + 2 * n:], columns[3:3 + n], columns[3 + n:3 + 2 * n]
+
+    def clear(self):
+        with self.lock:
+            self.recent.clear()
+            for tier in self.tiers:
+                tier.buckets.clear()
+                tier.bucket_size = tier.initial_bucket_size
+                tier.dropped = False
+                tier.count = 0
+            self.samples = 0
+            self.first_ms = None
+
+
+def envelope(times, minimums, maximums):
+    """Pontos (x, y) de uma linha que percorre mínimo e máximo de cada bloco, para desenhar a faixa da série."""
+    x = np.repeat(times, 2)
+    y = np.empty(2 * len(times))
+    y[0::2] = minimums
+    y[1::2] = maximums
+    return x, y
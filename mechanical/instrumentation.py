@@ -0,0 +1,192 @@
+"""Medição da latência de cada etapa do processamento de frames.
+
+As etapas (captura, conversão, inferência, análise, desenho, gravação e
+exibição) são medidas com `with instrumentation.stage("inference"):` e
+guardadas em janelas circulares, de onde saem percentis e histogramas. Desligada, a interface usa
+NULL_INSTRUMENTATION, cujos métodos não fazem nada, então o custo é desprezível.
+O snapshot pode ser desenhado no frame (HUD) e lido por um coletor local em
+GET /metrics (JSON).
+"""
+import json
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+
+# "latency" e "sync" não são etapas: são o tempo da captura de um frame da câmera até a sua análise
+# e, com duas câmeras, a diferença entre os instantes de captura dos frames exibidos juntos
+STAGES = ("capture", "convert", "inference", "analysis", "draw", "record", "display", "latency", "sync")
+
+# Limites superiores (ms) dos baldes do histograma
+HISTOGRAM_BUCKETS_MS = (1, 2, 5, 10, 20, 33, 50, 100, 200, 500)
+
+DEFAULT_METRICS_PORT = 9465
+
+
+class StageHistogram:
+    """Janela circular com as últimas `window` medições de uma etapa."""
+
+    def __init__(self, window=300):
+        self.samples = np.zeros(window, dtype=np.float64)
+        self.count = 0
+
+    def add(self, elapsed_ms):
+        self.samples[self.count % len(self.samples)] = elapsed_ms
+        self.count += 1
+
+    def values(self):
+        return self.samples[:min(self.count, len(self.samples))].copy()
+
+
+def summarize(values, count):
+    """Percentis e histograma acumulado (como no Prometheus) de uma janela de medições."""
+    if len(values) == 0:
+        return {"count": count}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    buckets = np.searchsorted(np.sort(values), HISTOGRAM_BUCKETS_MS, side="right")
+    histogram = {str(limit): int(total) for limit, total in zip(HISTOGRAM_BUCKETS_MS, buckets)}
+    histogram["+Inf"] = len(values)
+    return {
+        "count": count,
+        "window": len(values),
+        "mean_ms": float(values.mean()),
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "max_ms": float(values.max()),
+        "histogram_ms": histogram,
+    }
+
+
+class Stage:
+    """Context manager que mede uma execução de uma etapa."""
+
+    __slots__ = ("instrumentation", "name", "start")
+
+    def __init__(self, instrumentation, name):
+        self.instrumentation = instrumentation
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.instrumentation.record(self.name, (time.perf_counter() - self.start) * 1000)
+
+
+class Instrumentation:
+    enabled = True
+
+    def __init__(self, window=300):
+        self.window = window
+        self.lock = threading.Lock()
+        self.histograms = {name: StageHistogram(window) for name in STAGES}
+        self.frame_times = deque(maxlen=window)
+
+    def stage(self, name):
+        return Stage(self, name)
+
+    def record(self, name, elapsed_ms):
+        # As etapas são medidas em threads diferentes no pipeline
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = StageHistogram(self.window)
+            histogram.add(elapsed_ms)
+
+    def frame(self):
+        """Marca um frame entregue à exibição, para calcular o fps."""
+        with self.lock:
+            self.frame_times.append(time.perf_counter())
+
+    def fps(self):
+        with self.lock:
+            if len(self.frame_times) < 2:
+                return 0.0
+            first, last = self.frame_times[0], self.frame_times[-1]
+            frames = len(self.frame_times) - 1
+        return frames / (last - first) if last > first else 0.0
+
+    def snapshot(self):
+        """Retorna fps e estatísticas de cada etapa como dicionário serializável."""
+        with self.lock:
+            windows = {name: (histogram.values(), histogram.count) for name, histogram in self.histograms.items()}
+        return {
+            "timestamp": time.time(),
+            "fps": self.fps(),
+            "stages": {name: summarize(values, count) for name, (values, count) in windows.items()},
+        }
+
+    def draw_overlay(self, annotated_frame):
+        """HUD no canto superior direito com o fps e a mediana de cada etapa."""
+        with self.lock:
+            medians = [(name, np.median(histogram.values())) for name, histogram in self.histograms.items()
+                       if histogram.count]
+        lines = [f"{self.fps():.1f} fps"] + [f"{name}: {median:.1f} ms" for name, median in medians]
+        x = annotated_frame.shape[1] - 220
+        for index, line in enumerate(lines):
+            cv2.putText(annotated_frame, line, (x, 25 + index * 22), cv2.FONT_HERSHEY_SIMPLEX, 0.55,
+                        (0, 255, 255), 1)
+
+
+class NullInstrumentation:
+    """Instrumentação desligada: nada é medido nem guardado."""
+
+    enabled = False
+
+    def __init__(self):
+        self.null_stage = nullcontext()
+
+    def stage(self, name):
+        return self.null_stage
+
+    def record(self, name, elapsed_ms):
+        pass
+
+    def frame(self):
+        pass
+
+
+NULL_INSTRUMENTATION = NullInstrumentation()
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = json.dumps(self.server.instrumentation.snapshot()).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Um coletor consultando a cada poucos segundos não deve poluir o terminal
+        pass
+
+
+class MetricsServer:
+    """Servidor HTTP local que entrega o snapshot da instrumentação em GET /metrics."""
+
+    def __init__(self, instrumentation, port=DEFAULT_METRICS_PORT, host="127.0.0.1"):
+        self.server = ThreadingHTTPServer((host, port), MetricsHandler)
+        self.server.instrumentation = instrumentation
+        self.thread = threading.Thread(target=self.server.serve_forever, name="metricas", daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,122 @@
+"""Backend de inferência com o PoseLandmarker do Mediapipe Tasks.
+
+Arquivos usam o modo VIDEO (síncrono, com rastreamento entre frames). Câmeras
+usam o modo LIVE_STREAM: `process` envia o frame com `detect_async` e retorna
+imediatamente o resultado mais recente entregue pelo callback, então quem chama
+nunca espera pela inferência; o tempo do envio até o callback de cada frame
+fica em `pop_latencies()`. Os resultados são adaptados para a interface
+`results.pose_landmarks.landmark` lida pelas análises.
+"""
+import os
+import threading
+import time
+from collections import deque
+
+import mediapipe as mp
+import numpy as np
+from mediapipe.tasks.python import BaseOptions
+from mediapipe.tasks.python.vision import PoseLandmarker, PoseLandmarkerOptions, RunningMode
+
+from pose import Landmark, PoseLandmarks
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models")
+
+# Variantes na ordem de complexidade (equivalentes a model_complexity 0, 1 e 2)
+MODEL_VARIANTS = ("lite", "full", "heavy")
+
+
+def model_path(variant):
+    return os.path.join(MODELS_DIR, f"pose_landmarker_{variant}.task")
+
+
+class TasksResults:
+    """Adapta um PoseLandmarkerResult para `results.pose_landmarks.landmark`."""
+
+    def __init__(self, result=None):
+        if result is None or not result.pose_landmarks:
+            self.pose_landmarks = None
+        else:
+            self.pose_landmarks = PoseLandmarks([
+                Landmark(landmark.x, landmark.y, landmark.z,
+                         landmark.visibility if landmark.visibility is not None else 0.0)
+                for landmark in result.pose_landmarks[0]
+            ])
+
+
+class TasksPose:
+    """Substituto do Pose baseado no PoseLandmarker (modelos .task lite/full/heavy)."""
+
+    def __init__(self, variant="full", live=False, min_detection_confidence=0.5, min_tracking_confidence=0.5):
+        path = model_path(variant)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Modelo não encontrado: {path}")
+
+        self.variant = variant
+        self.live = live
+        # No modo LIVE_STREAM o resultado chega depois, referente a um frame anterior
+        self.asynchronous = live
+        # Suavização pelo timestamp do frame (posição no vídeo ou instante da captura)
+        self.uses_timestamps = True
+        self.latest_results = TasksResults()
+        self.lock = threading.Lock()
+        self.last_timestamp_ms = -1
+        # LIVE_STREAM: (timestamp, instante do envio) dos frames à espera do callback e latências já medidas
+        self.submitted = deque()
+        self.latencies = []
+        self.options = PoseLandmarkerOptions(
+            base_options=BaseOptions(model_asset_path=path),
+            running_mode=RunningMode.LIVE_STREAM if live else RunningMode.VIDEO,
+            num_poses=1,
+            min_pose_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+            result_callback=self.on_result if live else None
+        )
+        self.landmarker = PoseLandmarker.create_from_options(self.options)
+
+    def on_result(self, result, output_image, timestamp_ms):
+        results = TasksResults(result)
+        now = time.perf_counter()
+        with self.lock:
+            self.latest_results = results
+            # Frames anteriores sem callback foram descartados pelo Mediapipe
+            while self.submitted and self.submitted[0][0] < timestamp_ms:
+                self.submitted.popleft()
+            if self.submitted and self.submitted[0][0] == timestamp_ms:
+                self.latencies.append((now - self.submitted.popleft()[1]) * 1000)
+
+    def pop_latencies(self):
+        """Latências (ms) do envio até o resultado, dos frames concluídos desde a última chamada."""
+        with self.lock:
+            latencies, self.latencies = self.latencies, []
+        return latencies
+
+    def next_timestamp(self, timestamp_ms):
+        """Os modos VIDEO e LIVE_STREAM exigem timestamps inteiros estritamente crescentes."""
+        if timestamp_ms is None:
+            timestamp_ms = time.monotonic() * 1000
+        timestamp_ms = max(int(timestamp_ms), self.last_timestamp_ms + 1)
+        self.last_timestamp_ms = timestamp_ms
+        return timestamp_ms
+
+    def process(self, frame_rgb, timestamp_ms=None):
+        image = mp.Image(image_format=mp.ImageFormat.SRGB, data=np.ascontiguousarray(frame_rgb))
+        timestamp_ms = self.next_timestamp(timestamp_ms)
+        if self.live:
+            with self.lock:
+                self.submitted.append((timestamp_ms, time.perf_counter()))
+            self.landmarker.detect_async(image, timestamp_ms)
+            with self.lock:
+                return self.latest_results
+        return TasksResults(self.landmarker.detect_for_video(image, timestamp_ms))
+
+    def reset(self):
+        """Recria o landmarker, reiniciando o rastreamento e os timestamps."""
+        self.landmarker.close()
+        self.landmarker = PoseLandmarker.create_from_options(self.options)
+        self.latest_results = TasksResults()
+        self.last_timestamp_ms = -1
+        self.submitted.clear()
+        self.latencies = []
+
+    def close(self):
+        self.landmarker.close()
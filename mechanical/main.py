@@ -1,17 +1,28 @@
 import sys
 import os
+import importlib
+import threading
+import time
 import cv2
 from PyQt5.QtWidgets import (
     QApplication, QLabel, QWidget, QVBoxLayout, QPushButton, QHBoxLayout,
-    QComboBox, QSizePolicy, QFileDialog
+    QComboBox, QSizePolicy, QFileDialog, QCheckBox, QTabWidget, QSpinBox
 )
-from PyQt5.QtGui import QImage, QPixmap
 from PyQt5.QtCore import QTimer, Qt
-import mediapipe as mp
 
-from analysis.ocillation import OscillationAnalysis
-from analysis.posture import PostureAnalysis
-from analysis.stride import StrideAnalysis
+from pose import DEFAULT_POSE_PARAMS, create_pose, mp_pose
+from analysis.base import AnalysisSet
+from pipeline import FramePipeline, frame_timestamp_ms
+from cache import CachedPose, LandmarkCache
+from refresh import DEFAULT_REFRESH_HZ, RefreshScheduler
+from quality import AdaptivePose, QualityController
+from tracking import RoiPose, SkippingPose
+from display import FrameDisplay
+from camera import CAMERA_MODES, DEFAULT_CAMERA_MODE, CameraDiscovery, CameraSource
+from instrumentation import NULL_INSTRUMENTATION, Instrumentation, MetricsServer
+from export import DEFAULT_EXPORT_DIR, FrameExporter, export_path
+from recorder import DEFAULT_RECORDING_DIR, RECORDING_CODECS, RECORDING_SIZES, SessionRecorder, recording_path
+from multicam import MULTI_CAMERA_VIEWS, CameraStream, MultiCameraSession
 
 os.environ['QT_QPA_PLATFORM_PLUGIN_PATH'] = '/usr/lib/x86_64-linux-gnu/qt5/plugins/platforms/'
 
@@ -32,16 +43,37 @@ class VideoWindow(QWidget):
         self.video_label = QLabel()
         self.video_label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         self.video_label.setAlignment(Qt.AlignCenter)
+        self.frame_display = FrameDisplay(self.video_label)
+
+        # Vista da segunda câmera, ao lado da primeira, só na sessão com duas câmeras
+        self.second_video_label = QLabel()
+        self.second_video_label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.second_video_label.setAlignment(Qt.AlignCenter)
+        self.second_video_label.hide()
+        self.second_frame_display = FrameDisplay(self.second_video_label)
 
         # Seletores de análise e câmera
         self.analysis_selector = QComboBox()
-        self.analysis_selector.addItems(["Análise de Oscilação Corporal", "Análise Postural Lateral", "Análise de Passada"])
+        self.analysis_selector.addItems([
+            "Análise de Oscilação Corporal", "Análise Postural Lateral", "Análise de Passada", "Todas as Análises"
+        ])
         self.analysis_selector.setCurrentIndex(0)
 
+        # Preenchido pela descoberta de câmeras em segundo plano
         self.camera_selector = QComboBox()
-        self.available_cameras = self.get_available_cameras()
-        self.camera_selector.addItems([f"Câmera {i} (Índice {i})" for i in self.available_cameras])
-        self.camera_selector.setCurrentIndex(0)
+        self.camera_selector.setPlaceholderText("Procurando câmeras...")
+        self.available_cameras = []
+
+        # Duas câmeras na mesma sessão: a escolhida acima (vista lateral) e a traseira
+        self.multi_camera_checkbox = QCheckBox("Duas câmeras")
+        self.second_camera_selector = QComboBox()
+        self.second_camera_selector.setPlaceholderText("Câmera traseira")
+
+        # Resolução e fps pedidos à câmera (em formato comprimido, quando houver)
+        self.camera_mode_selector = QComboBox()
+        for width, height, fps in CAMERA_MODES:
+            self.camera_mode_selector.addItem(f"{width}x{height} @ {fps} fps", (width, height, fps))
+        self.camera_mode_selector.setCurrentIndex(CAMERA_MODES.index(DEFAULT_CAMERA_MODE))
 
         # Botões de iniciar, carregar vídeo e parar
         self.start_button = QPushButton("Iniciar")
@@ -54,6 +86,57 @@ class VideoWindow(QWidget):
         self.stop_button.clicked.connect(self.stop_video)
         self.stop_button.setEnabled(False)
 
+        # Captura, inferência e análise em threads separadas
+        self.pipeline_checkbox = QCheckBox("Processamento em paralelo")
+        self.pipeline_checkbox.setChecked(True)
+
+        # Taxa de atualização dos painéis, independente da taxa de inferência
+        self.refresh_rate_spinbox = QSpinBox()
+        self.refresh_rate_spinbox.setRange(1, 60)
+        self.refresh_rate_spinbox.setValue(DEFAULT_REFRESH_HZ)
+        self.refresh_rate_spinbox.setSuffix(" Hz")
+
+        # Qualidade adaptativa (câmera): ajusta o modelo para caber no orçamento por frame
+        self.adaptive_quality_checkbox = QCheckBox("Qualidade adaptativa")
+        self.latency_budget_spinbox = QSpinBox()
+        self.latency_budget_spinbox.setRange(5, 500)
+        self.latency_budget_spinbox.setValue(33)
+        self.latency_budget_spinbox.setSuffix(" ms")
+
+        # Backend de inferência: Pose legado ou PoseLandmarker (Tasks) com modelo .task
+        self.model_selector = QComboBox()
+        self.model_options = {
+            "Pose (legado)": None,
+            "Landmarker Lite": "lite",
+            "Landmarker Full": "full",
+            "Landmarker Heavy": "heavy",
+        }
+        self.model_selector.addItems(list(self.model_options))
+
+        # Inferência apenas na região do atleta encontrada no frame anterior
+        self.roi_checkbox = QCheckBox("Recorte (ROI)")
+
+        # Câmeras de alta taxa: inferência a cada N frames, landmarks previstos entre elas
+        self.frame_skip_checkbox = QCheckBox("Inferência a cada")
+        self.frame_skip_spinbox = QSpinBox()
+        self.frame_skip_spinbox.setRange(2, 16)
+        self.frame_skip_spinbox.setValue(4)
+        self.frame_skip_spinbox.setSuffix(" frames")
+
+        # Latência por etapa no vídeo e em GET /metrics para um coletor local
+        self.metrics_checkbox = QCheckBox("Métricas")
+
+        # Valores das análises a cada frame, gravados em lotes num arquivo (Parquet ou CSV)
+        self.export_checkbox = QCheckBox("Exportar")
+
+        # Vídeo anotado da sessão, codificado numa thread à parte
+        self.record_checkbox = QCheckBox("Gravar")
+        self.record_codec_selector = QComboBox()
+        self.record_codec_selector.addItems(list(RECORDING_CODECS))
+        self.record_size_selector = QComboBox()
+        for size in RECORDING_SIZES:
+            self.record_size_selector.addItem(f"{size[0]}x{size[1]}" if size else "Original", size)
+
         # Layout de controle
         control_layout = QHBoxLayout()
         control_layout.addWidget(self.start_button)
@@ -63,13 +146,34 @@ class VideoWindow(QWidget):
         control_layout.addWidget(self.analysis_selector)
         control_layout.addWidget(QLabel("Câmera:"))
         control_layout.addWidget(self.camera_selector)
+        control_layout.addWidget(self.camera_mode_selector)
+        control_layout.addWidget(self.multi_camera_checkbox)
+        control_layout.addWidget(self.second_camera_selector)
+        control_layout.addWidget(QLabel("Modelo:"))
+        control_layout.addWidget(self.model_selector)
+        control_layout.addWidget(self.pipeline_checkbox)
+        control_layout.addWidget(QLabel("Painéis:"))
+        control_layout.addWidget(self.refresh_rate_spinbox)
+        control_layout.addWidget(self.adaptive_quality_checkbox)
+        control_layout.addWidget(self.latency_budget_spinbox)
+        control_layout.addWidget(self.roi_checkbox)
+        control_layout.addWidget(self.frame_skip_checkbox)
+        control_layout.addWidget(self.frame_skip_spinbox)
+        control_layout.addWidget(self.metrics_checkbox)
+        control_layout.addWidget(self.export_checkbox)
+        control_layout.addWidget(self.record_checkbox)
+        control_layout.addWidget(self.record_codec_selector)
+        control_layout.addWidget(self.record_size_selector)
 
         # Layout para as análises
         self.analysis_layout = QVBoxLayout()
 
         # Layout esquerdo (vídeo e controles)
+        video_layout = QHBoxLayout()
+        video_layout.addWidget(self.video_label)
+        video_layout.addWidget(self.second_video_label)
         left_layout = QVBoxLayout()
-        left_layout.addWidget(self.video_label)
+        left_layout.addLayout(video_layout)
         left_layout.addLayout(control_layout)
 
         # Layout direito (dados das análises)
@@ -84,21 +188,31 @@ class VideoWindow(QWidget):
 
         # Inicializar captura de vídeo
         self.cap = None
+        self.live = False
+        self.pipeline = None
+        self.multi_camera = None
+        self.exporter = None
+        self.recorder = None
+        # Frame lido da última vez, reaproveitado como destino da próxima leitura
+        self.frame_buffer = None
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_frame)
-
-        # Inicializar Mediapipe Pose
-        self.mp_pose = mp.solutions.pose
-        self.pose = self.mp_pose.Pose(
-            static_image_mode=False,
-            model_complexity=2,
-            enable_segmentation=False,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
-        )
-
-        self.mp_drawing = mp.solutions.drawing_utils
-        self.mp_drawing_styles = mp.solutions.drawing_styles
+        self.refresh_scheduler = RefreshScheduler(DEFAULT_REFRESH_HZ)
+        self.refresh_rate_spinbox.valueChanged.connect(self.refresh_scheduler.set_rate)
+
+        # Mediapipe Pose: criado no aquecimento, em segundo plano
+        self.mp_pose = mp_pose
+        self.pose_params = dict(DEFAULT_POSE_PARAMS)
+        self.pose = None
+
+        # Cache de landmarks: recarregar o mesmo vídeo não repete a inferência
+        self.landmark_cache = LandmarkCache()
+        self.cached_pose = None
+        # Pose criado só para a sessão atual (qualidade adaptativa ou PoseLandmarker)
+        self.session_pose = None
+        self.frame_overlays = []
+        self.instrumentation = NULL_INSTRUMENTATION
+        self.metrics_server = None
 
         # Inicializar variáveis de análise
         self.analysis_type = "Análise de Oscilação Corporal"
@@ -106,17 +220,65 @@ class VideoWindow(QWidget):
         self.initial_frames = 30
         self.max_points = 100
 
-        # Instanciar classes de análise
+        # Módulo e classe de cada análise, importados no aquecimento (o pyqtgraph é pesado)
         self.analyses = {
-            "Análise de Oscilação Corporal": OscillationAnalysis,
-            "Análise Postural Lateral": PostureAnalysis,
-            "Análise de Passada": StrideAnalysis 
+            "Análise de Oscilação Corporal": ("analysis.ocillation", "OscillationAnalysis"),
+            "Análise Postural Lateral": ("analysis.posture", "PostureAnalysis"),
+            "Análise de Passada": ("analysis.stride", "StrideAnalysis"),
         }
-        self.current_analysis = None
+        self.all_analyses_name = "Todas as Análises"
+        self.current_analyses = []
+        # Análises ativas do modo sem pipeline: convertem e desenham só o que declaram
+        self.analysis_set = AnalysisSet(())
 
         # Conectar sinal de mudança de análise
         self.analysis_selector.currentIndexChanged.connect(self.on_analysis_change)
 
+        # A janela aparece logo; Mediapipe, pyqtgraph e câmeras são carregados em segundo plano
+        self.warm_up_thread = threading.Thread(target=self.warm_up, name="aquecimento", daemon=True)
+        self.warm_up_thread.start()
+        self.camera_discovery = CameraDiscovery(parent=self)
+        self.camera_discovery.camera_found.connect(self.on_camera_found)
+        self.camera_discovery.finished.connect(self.on_camera_discovery_finished)
+        self.camera_discovery.start()
+
+    def warm_up(self):
+        """Importa as análises (pyqtgraph) e cria o Pose (Mediapipe) fora da thread da GUI."""
+        for module_name, _ in self.analyses.values():
+            importlib.import_module(module_name)
+        self.pose = create_pose(**self.pose_params)
+
+    def wait_warm_up(self):
+        """Aguarda o aquecimento, que só demora se a sessão começar logo após abrir a janela."""
+        self.warm_up_thread.join()
+        if self.pose is None:
+            # O aquecimento falhou: tenta de novo aqui, para o erro aparecer a quem iniciou
+            self.pose = create_pose(**self.pose_params)
+
+    def analysis_class(self, analysis_name):
+        module_name, class_name = self.analyses[analysis_name]
+        return getattr(importlib.import_module(module_name), class_name)
+
+    def on_camera_found(self, index):
+        self.available_cameras.append(index)
+        self.camera_selector.addItem(f"Câmera {index} (Índice {index})")
+        self.second_camera_selector.addItem(f"Câmera {index} (Índice {index})")
+        if self.camera_selector.currentIndex() < 0:
+            self.camera_selector.setCurrentIndex(0)
+        # A traseira, por padrão, é a segunda câmera encontrada
+        if self.second_camera_selector.currentIndex() < 0 or len(self.available_cameras) == 2:
+            self.second_camera_selector.setCurrentIndex(len(self.available_cameras) - 1)
+
+    def selected_camera(self, selector):
+        """Índice da câmera escolhida; antes de a descoberta encontrar alguma câmera, o índice 0."""
+        selected_index = selector.currentIndex()
+        return self.available_cameras[selected_index] if selected_index >= 0 else 0
+
+    def on_camera_discovery_finished(self, available_cameras):
+        if not available_cameras:
+            # Nenhuma câmera respondeu: mantém o índice 0 como opção
+            self.on_camera_found(0)
+
     def on_analysis_change(self, index):
         analysis_name = self.analysis_selector.currentText()
         self.setup_analysis(analysis_name)
@@ -126,11 +288,32 @@ class VideoWindow(QWidget):
         # Limpar layout atual
         self.clear_analysis_layout()
 
+        self.current_analyses = []
+        if analysis_name == self.all_analyses_name:
+            # Uma aba por análise; todas recebem os landmarks da mesma inferência
+            tabs = QTabWidget()
+            for name in self.analyses:
+                self.create_analysis_tab(tabs, name, name)
+            self.analysis_layout.addWidget(tabs)
+            return
+
         # Instanciar a classe de análise
-        analysis_class = self.analyses.get(analysis_name)
-        if analysis_class:
-            self.current_analysis = analysis_class(self.analysis_layout, self.mp_pose, self.max_points, self.initial_frames)
-            self.current_analysis.setup_ui()
+        if analysis_name in self.analyses:
+            self.create_analysis(analysis_name, self.analysis_layout)
+
+    def create_analysis(self, analysis_name, layout):
+        """Instancia a análise com o painel em `layout` e a inclui nas análises da sessão."""
+        analysis_class = self.analysis_class(analysis_name)
+        analysis = analysis_class(layout, self.mp_pose, self.max_points, self.initial_frames)
+        analysis.setup_ui()
+        self.current_analyses.append(analysis)
+        return analysis
+
+    def create_analysis_tab(self, tabs, title, analysis_name):
+        tab = QWidget()
+        analysis = self.create_analysis(analysis_name, QVBoxLayout(tab))
+        tabs.addTab(tab, title)
+        return analysis
 
     def clear_analysis_layout(self):
         """Limpa o layout de análises."""
@@ -139,41 +322,30 @@ class VideoWindow(QWidget):
             if child.widget():
                 child.widget().deleteLater()
 
-    def get_available_cameras(self):
-        """Retorna uma lista de índices de câmeras disponíveis."""
-        available_cameras = []
-        max_tested = 10
-        for index in range(0, max_tested):
-            cap = cv2.VideoCapture(index)
-            if cap.read()[0]:
-                available_cameras.append(index)
-                cap.release()
-            else:
-                cap.release()
-        if not available_cameras:
-            available_cameras.append(0)
-        return available_cameras
-
     def start_video(self):
         """Inicia a captura de vídeo da webcam."""
-        selected_camera_index = self.camera_selector.currentIndex()
-        camera_index = self.available_cameras[selected_camera_index]
-        self.cap = cv2.VideoCapture(camera_index)
+        if self.multi_camera_checkbox.isChecked():
+            self.start_multi_camera()
+            return
+        camera_index = self.selected_camera(self.camera_selector)
+        width, height, fps = self.camera_mode_selector.currentData()
+        self.cap = CameraSource(camera_index, width, height, fps)
         if not self.cap.isOpened():
             print(f"Erro ao abrir a câmera no índice {camera_index}")
+            self.cap.release()
+            self.cap = None
             return
+        settings = self.cap.settings
+        print(f"Câmera {camera_index}: {settings['fourcc']} {settings['width']}x{settings['height']} "
+              f"a {settings['fps']:.0f} fps")
 
-        self.analysis_type = self.analysis_selector.currentText()
-        self.setup_analysis(self.analysis_type)
-
-        self.timer.start(30)
-        self.start_button.setEnabled(False)
-        self.load_video_button.setEnabled(False)
-        self.stop_button.setEnabled(True)
-        self.camera_selector.setEnabled(False)
-        self.analysis_selector.setEnabled(False)
-
-        self.frames_captured = 0
+        if not self.setup_inference(live=True):
+            self.cap.release()
+            self.cap = None
+            return
+        self.frame_overlays.append(self.cap.draw_overlay)
+        self.cap.start()
+        self.start_processing(live=True)
 
     def load_video(self):
         """Permite ao usuário selecionar um arquivo de vídeo para análise."""
@@ -184,70 +356,358 @@ class VideoWindow(QWidget):
                 print(f"Erro ao abrir o vídeo {video_path}")
                 return
 
-            self.analysis_type = self.analysis_selector.currentText()
-            self.setup_analysis(self.analysis_type)
+            if not self.setup_inference(live=False, video_path=video_path):
+                self.cap.release()
+                self.cap = None
+                return
+            self.start_processing(live=False)
+
+    def setup_inference(self, live, video_path=None):
+        """Monta a inferência: modelo escolhido, qualidade adaptativa (câmera), ROI e cache (arquivos).
+
+        Retorna False se o modelo selecionado não puder ser carregado.
+        """
+        self.frame_overlays = []
+        self.setup_instrumentation()
+        self.wait_warm_up()
+        variant = self.model_options[self.model_selector.currentText()]
+        try:
+            if live and self.adaptive_quality_checkbox.isChecked():
+                controller = QualityController(self.latency_budget_spinbox.value())
+                self.session_pose = AdaptivePose(
+                    controller, lambda model_complexity: self.create_backend(model_complexity, variant, live)
+                )
+                self.frame_overlays.append(self.session_pose.draw_overlay)
+            elif variant is not None:
+                # Importado só com o PoseLandmarker selecionado (Mediapipe Tasks)
+                from landmarker import TasksPose
+                self.session_pose = TasksPose(
+                    variant, live=live,
+                    min_detection_confidence=self.pose_params["min_detection_confidence"],
+                    min_tracking_confidence=self.pose_params["min_tracking_confidence"]
+                )
+        except FileNotFoundError as error:
+            print(error)
+            self.stop_instrumentation()
+            return False
+        pose = self.session_pose or self.pose
+
+        cache_params = self.pose_params
+        if variant is not None:
+            cache_params = dict(self.pose_params, backend="tasks", model=variant)
+        pose, cache_params = self.wrap_tracking(pose, cache_params, self.frame_overlays)
+
+        if video_path is None:
+            self.cached_pose = CachedPose(pose, cache_params, instrumentation=self.instrumentation)
+        else:
+            # A chave (hash do vídeo) é calculada fora da thread da GUI
+            self.cached_pose = CachedPose(pose, cache_params, self.landmark_cache,
+                                          instrumentation=self.instrumentation, video_path=video_path)
+        if self.instrumentation.enabled:
+            self.frame_overlays.append(self.instrumentation.draw_overlay)
+        return True
+
+    def wrap_tracking(self, pose, cache_params, overlays):
+        """Aplica o recorte (ROI) e a inferência a cada N frames, se marcados; retorna o Pose e os parâmetros do cache."""
+        # No LIVE_STREAM o resultado chega depois, e não corresponde ao recorte (ou ao frame) atual
+        if self.roi_checkbox.isChecked() and not getattr(pose, "asynchronous", False):
+            pose = RoiPose(pose)
+            overlays.append(pose.draw_overlay)
+            # O recorte altera os landmarks, então o cache é separado
+            cache_params = dict(cache_params, roi_tracking=True)
+        if self.frame_skip_checkbox.isChecked() and not getattr(pose, "asynchronous", False):
+            interval = self.frame_skip_spinbox.value()
+            pose = SkippingPose(pose, interval)
+            overlays.append(pose.draw_overlay)
+            cache_params = dict(cache_params, infer_every=interval)
+        return pose, cache_params
+
+    def setup_instrumentation(self):
+        """Liga a medição por etapa e o endpoint de métricas se `Métricas` estiver marcado."""
+        if not self.metrics_checkbox.isChecked():
+            self.instrumentation = NULL_INSTRUMENTATION
+            return
+        self.instrumentation = Instrumentation()
+        try:
+            self.metrics_server = MetricsServer(self.instrumentation)
+        except OSError as error:
+            print(f"Erro ao iniciar o servidor de métricas: {error}")
+            return
+        self.metrics_server.start()
+        print(f"Métricas disponíveis em {self.metrics_server.url}")
+
+    def stop_instrumentation(self):
+        """Para o endpoint de métricas e desliga a medição, ao fim da sessão ou quando ela não pôde começar."""
+        if self.metrics_server:
+            self.metrics_server.stop()
+            self.metrics_server = None
+        self.instrumentation = NULL_INSTRUMENTATION
+
+    def create_backend(self, model_complexity, variant, live):
+        """Cria o Pose de um nível de qualidade: legado ou PoseLandmarker (lite/full/heavy)."""
+        if variant is None:
+            return create_pose(
+                model_complexity=model_complexity,
+                min_detection_confidence=self.pose_params["min_detection_confidence"],
+                min_tracking_confidence=self.pose_params["min_tracking_confidence"]
+            )
+        from landmarker import MODEL_VARIANTS, TasksPose
+        return TasksPose(
+            MODEL_VARIANTS[model_complexity], live=live,
+            min_detection_confidence=self.pose_params["min_detection_confidence"],
+            min_tracking_confidence=self.pose_params["min_tracking_confidence"]
+        )
 
+    def start_processing(self, live):
+        """Configura a análise e inicia o processamento dos frames de self.cap."""
+        self.analysis_type = self.analysis_selector.currentText()
+        self.setup_analysis(self.analysis_type)
+        self.live = live
+        self.setup_export()
+        self.setup_recording()
+
+        if self.pipeline_checkbox.isChecked():
+            # O timer apenas exibe o último resultado; o processamento roda nas threads
+            self.pipeline = FramePipeline(self.cap, self.cached_pose, self.current_analyses, live=live,
+                                          render=self.frame_display.fit, overlays=self.frame_overlays,
+                                          instrumentation=self.instrumentation, exporter=self.exporter,
+                                          recorder=self.recorder)
+            self.pipeline.start()
+            self.timer.start(15)
+        else:
+            self.analysis_set = AnalysisSet(self.current_analyses)
             self.timer.start(30)
-            self.start_button.setEnabled(False)
-            self.load_video_button.setEnabled(False)
-            self.stop_button.setEnabled(True)
-            self.camera_selector.setEnabled(False)
-            self.analysis_selector.setEnabled(False)
+        self.refresh_scheduler.start(self.current_analyses)
+
+        self.set_controls_enabled(False)
 
-            self.frames_captured = 0
+        self.frames_captured = 0
+        self.frame_size = None
+
+    def setup_export(self):
+        """Abre o arquivo de exportação da sessão, se a exportação estiver marcada."""
+        self.exporter = self.create_exporter(self.current_analyses, time.strftime("sessao_%Y%m%d_%H%M%S"))
+
+    def create_exporter(self, analyses, name):
+        if not self.export_checkbox.isChecked() or not analyses:
+            return None
+        try:
+            os.makedirs(DEFAULT_EXPORT_DIR, exist_ok=True)
+            return FrameExporter(export_path(DEFAULT_EXPORT_DIR, name), analyses)
+        except OSError as error:
+            print(f"Não foi possível exportar a sessão: {error}")
+            return None
+
+    def setup_recording(self):
+        """Inicia a gravação do vídeo anotado, se estiver marcada."""
+        self.recorder = self.create_recorder(self.cap, time.strftime("sessao_%Y%m%d_%H%M%S"))
+
+    def create_recorder(self, cap, name):
+        if not self.record_checkbox.isChecked():
+            return None
+        codec = self.record_codec_selector.currentText()
+        try:
+            os.makedirs(DEFAULT_RECORDING_DIR, exist_ok=True)
+        except OSError as error:
+            print(f"Não foi possível gravar a sessão: {error}")
+            return None
+        return SessionRecorder(recording_path(DEFAULT_RECORDING_DIR, name, codec), cap.get(cv2.CAP_PROP_FPS),
+                               self.record_size_selector.currentData(), codec)
+
+    def start_multi_camera(self):
+        """Inicia a sessão com duas câmeras, cada uma com seu pipeline, seu Pose e as análises da sua vista."""
+        camera_indexes = (self.selected_camera(self.camera_selector), self.selected_camera(self.second_camera_selector))
+        if camera_indexes[0] == camera_indexes[1]:
+            print("Escolha câmeras diferentes para as vistas lateral e traseira")
+            return
+        self.setup_instrumentation()
+        self.wait_warm_up()
+        variant = self.model_options[self.model_selector.currentText()]
+        width, height, fps = self.camera_mode_selector.currentData()
+        session_name = time.strftime("sessao_%Y%m%d_%H%M%S")
+
+        self.clear_analysis_layout()
+        self.current_analyses = []
+        tabs = QTabWidget()
+        streams = []
+        displays = (self.frame_display, self.second_frame_display)
+        for (view, analysis_names), camera_index, display in zip(MULTI_CAMERA_VIEWS, camera_indexes, displays):
+            cap = CameraSource(camera_index, width, height, fps)
+            if not cap.isOpened():
+                print(f"Erro ao abrir a câmera no índice {camera_index}")
+                cap.release()
+                self.abort_multi_camera(streams)
+                return
+            # O rastreamento entre frames é por câmera: cada uma precisa do seu Pose
+            try:
+                if variant is None:
+                    session_pose = create_pose(**self.pose_params) if streams else None
+                else:
+                    from landmarker import TasksPose
+                    session_pose = TasksPose(
+                        variant, live=True,
+                        min_detection_confidence=self.pose_params["min_detection_confidence"],
+                        min_tracking_confidence=self.pose_params["min_tracking_confidence"]
+                    )
+            except FileNotFoundError as error:
+                print(error)
+                cap.release()
+                self.abort_multi_camera(streams)
+                return
+            overlays = [cap.draw_overlay]
+            pose, cache_params = self.wrap_tracking(session_pose or self.pose, self.pose_params, overlays)
+            if self.instrumentation.enabled:
+                overlays.append(self.instrumentation.draw_overlay)
+
+            analyses = [self.create_analysis_tab(tabs, f"{view}: {name}", name) for name in analysis_names]
+            name = f"{session_name}_{view.lower()}"
+            exporter = self.create_exporter(analyses, name)
+            recorder = self.create_recorder(cap, name)
+            pipeline = FramePipeline(cap, CachedPose(pose, cache_params, instrumentation=self.instrumentation),
+                                     analyses, live=True, render=display.fit, overlays=overlays,
+                                     instrumentation=self.instrumentation, exporter=exporter, recorder=recorder)
+            streams.append(CameraStream(view, cap, pipeline, session_pose, exporter, recorder))
+            settings = cap.settings
+            print(f"{view}: câmera {camera_index}, {settings['fourcc']} {settings['width']}x{settings['height']} "
+                  f"a {settings['fps']:.0f} fps")
+
+        self.analysis_layout.addWidget(tabs)
+        self.second_video_label.show()
+        self.live = True
+        self.multi_camera = MultiCameraSession(streams)
+        self.multi_camera.start()
+        self.timer.start(15)
+        self.refresh_scheduler.start(self.current_analyses)
+        self.set_controls_enabled(False)
+
+    def abort_multi_camera(self, streams):
+        """Fecha as câmeras já abertas quando outra não pôde ser iniciada."""
+        for stream in streams:
+            stream.stop()
+        self.current_analyses = []
+        self.clear_analysis_layout()
+        self.stop_instrumentation()
+
+    def set_controls_enabled(self, enabled):
+        """Libera os controles de configuração fora de uma sessão e os trava durante ela."""
+        self.start_button.setEnabled(enabled)
+        self.load_video_button.setEnabled(enabled)
+        self.stop_button.setEnabled(not enabled)
+        for widget in (self.camera_selector, self.camera_mode_selector, self.multi_camera_checkbox,
+                       self.second_camera_selector, self.analysis_selector, self.pipeline_checkbox,
+                       self.adaptive_quality_checkbox, self.latency_budget_spinbox, self.roi_checkbox,
+                       self.frame_skip_checkbox, self.frame_skip_spinbox, self.metrics_checkbox,
+                       self.export_checkbox, self.record_checkbox, self.record_codec_selector,
+                       self.record_size_selector, self.model_selector):
+            widget.setEnabled(enabled)
 
     def stop_video(self):
         """Para a captura de vídeo."""
         self.timer.stop()
+        self.refresh_scheduler.stop()
+        if self.pipeline:
+            self.pipeline.stop()
+            self.pipeline = None
+        if self.multi_camera:
+            self.multi_camera.stop()
+            self.multi_camera = None
+            self.second_video_label.clear()
+            self.second_video_label.hide()
+        if self.exporter:
+            self.exporter.close()
+            print(f"Exportação gravada em {self.exporter.path}")
+            self.exporter = None
+        if self.recorder:
+            self.recorder.close()
+            if self.recorder.written:
+                print(f"Vídeo gravado em {self.recorder.path}")
+            self.recorder = None
+        if self.session_pose:
+            self.session_pose.close()
+            self.session_pose = None
+        self.stop_instrumentation()
         if self.cap:
             self.cap.release()
             self.cap = None
+        self.frame_buffer = None
         self.video_label.clear()
-        self.start_button.setEnabled(True)
-        self.load_video_button.setEnabled(True)
-        self.stop_button.setEnabled(False)
-        self.camera_selector.setEnabled(True)
-        self.analysis_selector.setEnabled(True)
+        self.set_controls_enabled(True)
 
-        if self.current_analysis:
-            self.current_analysis.reset()
-            self.current_analysis = None
+        for analysis in self.current_analyses:
+            analysis.reset()
+        self.current_analyses = []
 
         self.clear_analysis_layout()
 
     def update_frame(self):
         """Atualiza o frame do vídeo e processa a análise."""
-        if not self.cap:
+        if self.multi_camera:
+            self.show_multi_camera_frames()
             return
 
-        ret, frame = self.cap.read()
-        if ret:
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = self.pose.process(frame_rgb)
-
-            annotated_frame = frame.copy()
+        if self.pipeline:
+            self.show_pipeline_frame()
+            return
 
-            if results.pose_landmarks:
-                if self.current_analysis:
-                    self.current_analysis.process_frame(annotated_frame, results)
-            else:
-                cv2.putText(annotated_frame, "Aguardando detecção...", (10, 30),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+        if not self.cap:
+            return
 
-            qt_image = self.convert_cv_qt(annotated_frame)
-            self.video_label.setPixmap(qt_image)
+        with self.instrumentation.stage("capture"):
+            # O frame é lido no buffer anterior e anotado no lugar: nenhuma cópia por frame
+            ret, frame = self.cap.read(self.frame_buffer)
+        if ret:
+            self.frame_buffer = frame
+            timestamp_ms = frame_timestamp_ms(self.cap, self.live)
+            if self.live:
+                # Da captura (timestamp do driver, quando há) até a análise
+                self.instrumentation.record("latency", time.monotonic() * 1000 - timestamp_ms)
+            results = self.cached_pose.process(frame, timestamp_ms)
+            self.frame_size = (frame.shape[1], frame.shape[0])
+
+            with self.instrumentation.stage("analysis"):
+                annotated_frame = frame
+                landmarks = self.analysis_set.process(annotated_frame, results, timestamp_ms)
+                if self.exporter:
+                    self.exporter.add(timestamp_ms, landmarks is not None)
+            with self.instrumentation.stage("draw"):
+                if landmarks is None:
+                    cv2.putText(annotated_frame, "Aguardando detecção...", (10, 30),
+                                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+                for draw_overlay in self.frame_overlays:
+                    draw_overlay(annotated_frame)
+            if self.recorder:
+                with self.instrumentation.stage("record"):
+                    self.recorder.write(annotated_frame, timestamp_ms)
+
+            with self.instrumentation.stage("display"):
+                self.frame_display.show(annotated_frame)
+            self.instrumentation.frame()
         else:
-            # Se não houver mais frames (fim do vídeo), pare a reprodução
+            # Se não houver mais frames (fim do vídeo, ou câmera que parou de responder), grave o cache e pare
+            if self.frame_size is not None:
+                self.cached_pose.save(*self.frame_size)
             self.stop_video()
 
-    def convert_cv_qt(self, cv_img):
-        """Converte uma imagem OpenCV para QPixmap para exibição no QLabel."""
-        rgb_image = cv2.cvtColor(cv_img, cv2.COLOR_BGR2RGB)
-        h, w, ch = rgb_image.shape
-        bytes_per_line = ch * w
-        convert_to_Qt_format = QImage(rgb_image.data, w, h, bytes_per_line, QImage.Format.Format_RGB888)
-        p = convert_to_Qt_format.scaled(self.video_label.width(), self.video_label.height(), Qt.KeepAspectRatio)
-        return QPixmap.fromImage(p)
+    def show_multi_camera_frames(self):
+        """Exibe juntos os frames das câmeras capturados em instantes mais próximos."""
+        aligned = self.multi_camera.latest()
+        if aligned is not None:
+            images, skew_ms = aligned
+            self.instrumentation.record("sync", skew_ms)
+            for display, image in zip((self.frame_display, self.second_frame_display), images):
+                display.show_fitted(image)
+        elif self.multi_camera.finished:
+            # Uma das câmeras parou de responder
+            self.stop_video()
+
+    def show_pipeline_frame(self):
+        """Exibe o último frame produzido pelo pipeline."""
+        image = self.pipeline.latest()
+        if image is not None:
+            self.frame_display.show_fitted(image)
+        elif self.pipeline.finished:
+            # Fim do vídeo
+            self.stop_video()
 
 
 if __name__ == "__main__":
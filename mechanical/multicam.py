@@ -0,0 +1,102 @@
+"""Sessão com várias câmeras sincronizadas (ex.: vistas lateral e traseira).
+
+Cada câmera tem o seu FramePipeline, com CameraSource, Pose e análises
+próprios: captura, inferência e análise de cada câmera rodam em threads
+separadas e, como o OpenCV e o Mediapipe liberam o GIL, as câmeras ocupam
+núcleos diferentes em vez de se alternarem na thread da GUI. Os timestamps do
+CameraSource vêm do relógio monotônico (o do driver no V4L2, ou o fim da
+leitura), comum a todas as câmeras, então as análises de vistas diferentes
+ficam na mesma escala de tempo e o FrameSynchronizer exibe juntos os frames
+capturados em instantes mais próximos.
+"""
+from collections import deque
+
+# Vistas de uma sessão com duas câmeras e as análises que cada uma alimenta
+MULTI_CAMERA_VIEWS = (
+    ("Lateral", ("Análise Postural Lateral", "Análise de Passada")),
+    ("Traseira", ("Análise de Oscilação Corporal",)),
+)
+
+
+class FrameSynchronizer:
+    """Alinha pelo timestamp os últimos frames processados de cada câmera.
+
+    Guarda os `history` frames mais recentes de cada câmera e, como referência,
+    o instante mais recente que todas as câmeras já alcançaram: de cada uma é
+    escolhido o frame mais próximo dele. A câmera mais lenta define o ritmo da
+    exibição; a das outras é a mesma, com os frames intermediários pulados.
+    """
+
+    def __init__(self, streams, history=8):
+        self.histories = [deque(maxlen=history) for _ in range(streams)]
+        self.reference_ms = None
+
+    def add(self, stream, image, timestamp_ms):
+        self.histories[stream].append((image, timestamp_ms))
+
+    def aligned(self):
+        """Retorna (frames, diferença em ms entre eles) do novo instante comum, ou None se não houver."""
+        if not all(self.histories):
+            return None
+        reference_ms = min(history[-1][1] for history in self.histories)
+        if reference_ms == self.reference_ms:
+            return None
+        self.reference_ms = reference_ms
+        chosen = [min(history, key=lambda item: abs(item[1] - reference_ms)) for history in self.histories]
+        timestamps = [timestamp_ms for _, timestamp_ms in chosen]
+        return [image for image, _ in chosen], max(timestamps) - min(timestamps)
+
+
+class CameraStream:
+    """Uma câmera da sessão: fonte, pipeline e o que foi aberto para ela."""
+
+    def __init__(self, name, cap, pipeline, session_pose=None, exporter=None, recorder=None):
+        self.name = name
+        self.cap = cap
+        self.pipeline = pipeline
+        self.session_pose = session_pose
+        self.exporter = exporter
+        self.recorder = recorder
+
+    def stop(self):
+        self.pipeline.stop()
+        if self.exporter:
+            self.exporter.close()
+            print(f"Exportação ({self.name}) gravada em {self.exporter.path}")
+        if self.recorder:
+            self.recorder.close()
+            if self.recorder.written:
+                print(f"Vídeo ({self.name}) gravado em {self.recorder.path}")
+        if self.session_pose:
+            self.session_pose.close()
+        self.cap.release()
+
+
+class MultiCameraSession:
+    """Executa as câmeras em paralelo e entrega à exibição os frames alinhados."""
+
+    def __init__(self, streams):
+        self.streams = streams
+        self.synchronizer = FrameSynchronizer(len(streams))
+
+    def start(self):
+        for stream in self.streams:
+            stream.cap.start()
+            stream.pipeline.start()
+
+    def stop(self):
+        for stream in self.streams:
+            stream.stop()
+
+    @property
+    def finished(self):
+        """Uma câmera parou de responder: a sessão termina."""
+        return any(stream.pipeline.finished for stream in self.streams)
+
+    def latest(self):
+        """Retorna (frames, diferença em ms) do último instante comum às câmeras, ou None se não houver novo."""
+        for index, stream in enumerate(self.streams):
+            item = stream.pipeline.latest_with_timestamp()
+            if item is not None:
+                self.synchronizer.add(index, *item)
+        return self.synchronizer.aligned()
@@ -0,0 +1,206 @@
+"""Pipeline em threads: captura, inferência e análise/renderização em estágios separados.
+
+Cada estágio roda na sua própria thread e se comunica com o próximo por uma fila
+limitada. Em câmeras ao vivo as filas descartam o frame mais antigo, para que a
+inferência sempre trabalhe sobre o frame mais recente; em arquivos o produtor
+espera (backpressure) e nenhum frame é perdido.
+"""
+import queue
+import threading
+import time
+
+import cv2
+
+from analysis.base import AnalysisSet
+from instrumentation import NULL_INSTRUMENTATION
+
+# Marca o fim do vídeo ao passar pelas filas
+END_OF_STREAM = object()
+
+
+def frame_timestamp_ms(cap, live):
+    """Tempo do frame recém-lido: posição no arquivo ou, na câmera, o instante da captura."""
+    if live:
+        # O CameraSource guarda o instante da captura; no VideoCapture, vale o fim da leitura
+        capture_timestamp_ms = getattr(cap, "capture_timestamp_ms", None)
+        return capture_timestamp_ms if capture_timestamp_ms is not None else time.monotonic() * 1000
+    return cap.get(cv2.CAP_PROP_POS_MSEC)
+
+
+class FrameQueue:
+    """Fila limitada entre estágios do pipeline."""
+
+    def __init__(self, maxsize=2, drop_oldest=False):
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.drop_oldest = drop_oldest
+        self.dropped = 0
+
+    def put(self, item, stop_event):
+        """Insere um item; descarta o mais antigo ou bloqueia quando a fila está cheia."""
+        if self.drop_oldest and item is not END_OF_STREAM:
+            while True:
+                try:
+                    self.queue.put_nowait(item)
+                    return True
+                except queue.Full:
+                    try:
+                        self.queue.get_nowait()
+                        self.dropped += 1
+                    except queue.Empty:
+                        pass
+
+        while not stop_event.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(self, stop_event):
+        """Retira um item, retornando None se o pipeline for parado."""
+        while not stop_event.is_set():
+            try:
+                return self.queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return None
+
+    def get_nowait(self):
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            return None
+
+
+class FramePipeline:
+    """Executa captura, inferência e análise em paralelo sobre um cv2.VideoCapture.
+
+    `pose` é um CachedPose: recebe o frame BGR e devolve os landmarks, do cache
+    ou da inferência. Ao chegar ao fim do vídeo, os landmarks são gravados no cache.
+    As `analyses` rodam num AnalysisSet, que converte só os landmarks que elas usam.
+    `overlays` são funções que desenham informações extras no frame anotado,
+    que é o próprio frame capturado (nenhum estágio o usa depois da inferência).
+    `render` prepara o frame anotado para exibição fora da thread da GUI.
+    `instrumentation` mede a captura, a análise, o desenho e a renderização
+    (a conversão e a inferência são medidas pelo CachedPose).
+    `exporter`, se houver, recebe os valores das análises a cada frame, e
+    `recorder`, o frame anotado.
+    """
+
+    def __init__(self, cap, pose, analyses, live=False, render=None, overlays=(), queue_size=4,
+                 instrumentation=NULL_INSTRUMENTATION, exporter=None, recorder=None):
+        self.cap = cap
+        self.pose = pose
+        self.analyses = AnalysisSet(analyses)
+        self.live = live
+        self.render = render
+        self.overlays = overlays
+        self.instrumentation = instrumentation
+        self.exporter = exporter
+        self.recorder = recorder
+
+        # Ao vivo só interessa o frame mais recente; em arquivos, nenhum frame é perdido
+        size = 1 if live else queue_size
+        self.capture_queue = FrameQueue(size, drop_oldest=live)
+        self.inference_queue = FrameQueue(size, drop_oldest=live)
+        # A exibição sempre mostra apenas o último resultado
+        self.output_queue = FrameQueue(1, drop_oldest=True)
+
+        self.stop_event = threading.Event()
+        self.finished = False
+        self.threads = [
+            threading.Thread(target=self.capture_loop, name="captura", daemon=True),
+            threading.Thread(target=self.inference_loop, name="inferencia", daemon=True),
+            threading.Thread(target=self.analysis_loop, name="analise", daemon=True),
+        ]
+
+    def start(self):
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self):
+        """Interrompe os estágios e aguarda o término das threads."""
+        self.stop_event.set()
+        for thread in self.threads:
+            if thread.is_alive():
+                thread.join()
+
+    def latest(self):
+        """Retorna o último frame processado, ou None se não houver novo resultado."""
+        item = self.latest_with_timestamp()
+        return item[0] if item is not None else None
+
+    def latest_with_timestamp(self):
+        """Retorna (frame, timestamp_ms) do último frame processado, ou None se não houver novo resultado."""
+        item = self.output_queue.get_nowait()
+        if item is END_OF_STREAM:
+            self.finished = True
+            return None
+        return item
+
+    @property
+    def dropped_frames(self):
+        return self.capture_queue.dropped + self.inference_queue.dropped
+
+    def capture_loop(self):
+        while not self.stop_event.is_set():
+            with self.instrumentation.stage("capture"):
+                ret, frame = self.cap.read()
+            if not ret:
+                break
+            timestamp_ms = frame_timestamp_ms(self.cap, self.live)
+            if not self.capture_queue.put((frame, timestamp_ms), self.stop_event):
+                return
+        self.capture_queue.put(END_OF_STREAM, self.stop_event)
+
+    def inference_loop(self):
+        frame_size = None
+        while True:
+            item = self.capture_queue.get(self.stop_event)
+            if item is None:
+                return
+            if item is END_OF_STREAM:
+                if frame_size is not None:
+                    self.pose.save(*frame_size)
+                self.inference_queue.put(END_OF_STREAM, self.stop_event)
+                return
+
+            frame, timestamp_ms = item
+            frame_size = (frame.shape[1], frame.shape[0])
+            results = self.pose.process(frame, timestamp_ms)
+            if not self.inference_queue.put((frame, results, timestamp_ms), self.stop_event):
+                return
+
+    def analysis_loop(self):
+        while True:
+            item = self.inference_queue.get(self.stop_event)
+            if item is None:
+                return
+            if item is END_OF_STREAM:
+                self.output_queue.put(END_OF_STREAM, self.stop_event)
+                return
+
+            frame, results, timestamp_ms = item
+            if self.live:
+                # Da captura (timestamp do driver, quando há) até a análise
+                self.instrumentation.record("latency", time.monotonic() * 1000 - timestamp_ms)
+            with self.instrumentation.stage("analysis"):
+                annotated_frame = frame
+                landmarks = self.analyses.process(annotated_frame, results, timestamp_ms)
+                if self.exporter is not None:
+                    self.exporter.add(timestamp_ms, landmarks is not None)
+            with self.instrumentation.stage("draw"):
+                if landmarks is None:
+                    cv2.putText(annotated_frame, "Aguardando detecção...", (10, 30),
+                                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+                for draw_overlay in self.overlays:
+                    draw_overlay(annotated_frame)
+            if self.recorder is not None:
+                with self.instrumentation.stage("record"):
+                    self.recorder.write(annotated_frame, timestamp_ms)
+
+            with self.instrumentation.stage("display"):
+                image = self.render(annotated_frame) if self.render else annotated_frame
+            self.instrumentation.frame()
+            self.output_queue.put((image, timestamp_ms), self.stop_event)
@@ -0,0 +1,162 @@
+"""Criação do Mediapipe Pose e conversão dos seus resultados.
+
+O Mediapipe (cerca de 0,7 s de import, boa parte no matplotlib dos utilitários
+de desenho) só é importado quando um Pose é criado: os índices dos landmarks
+usados pelas análises estão em PoseLandmark, sem depender dele.
+"""
+import enum
+
+import numpy as np
+
+NUM_LANDMARKS = 33
+
+
+class PoseLandmark(enum.IntEnum):
+    """Índices dos 33 landmarks, iguais aos de mediapipe.solutions.pose.PoseLandmark."""
+
+    NOSE = 0
+    LEFT_EYE_INNER = 1
+    LEFT_EYE = 2
+    LEFT_EYE_OUTER = 3
+    RIGHT_EYE_INNER = 4
+    RIGHT_EYE = 5
+    RIGHT_EYE_OUTER = 6
+    LEFT_EAR = 7
+    RIGHT_EAR = 8
+    MOUTH_LEFT = 9
+    MOUTH_RIGHT = 10
+    LEFT_SHOULDER = 11
+    RIGHT_SHOULDER = 12
+    LEFT_ELBOW = 13
+    RIGHT_ELBOW = 14
+    LEFT_WRIST = 15
+    RIGHT_WRIST = 16
+    LEFT_PINKY = 17
+    RIGHT_PINKY = 18
+    LEFT_INDEX = 19
+    RIGHT_INDEX = 20
+    LEFT_THUMB = 21
+    RIGHT_THUMB = 22
+    LEFT_HIP = 23
+    RIGHT_HIP = 24
+    LEFT_KNEE = 25
+    RIGHT_KNEE = 26
+    LEFT_ANKLE = 27
+    RIGHT_ANKLE = 28
+    LEFT_HEEL = 29
+    RIGHT_HEEL = 30
+    LEFT_FOOT_INDEX = 31
+    RIGHT_FOOT_INDEX = 32
+
+
+class LazyPoseModule:
+    """Substituto de mediapipe.solutions.pose que só importa o Mediapipe no primeiro uso."""
+
+    PoseLandmark = PoseLandmark
+
+    def __getattr__(self, name):
+        import mediapipe as mp
+        return getattr(mp.solutions.pose, name)
+
+
+mp_pose = LazyPoseModule()
+
+# Parâmetros usados pelo analisador; também compõem a chave do cache de landmarks
+DEFAULT_POSE_PARAMS = {
+    "model_complexity": 2,
+    "min_detection_confidence": 0.5,
+    "min_tracking_confidence": 0.5,
+}
+
+
+def create_pose(model_complexity=2, min_detection_confidence=0.5, min_tracking_confidence=0.5):
+    """Cria uma instância do Mediapipe Pose com os parâmetros usados nas análises."""
+    return mp_pose.Pose(
+        static_image_mode=False,
+        model_complexity=model_complexity,
+        enable_segmentation=False,
+        min_detection_confidence=min_detection_confidence,
+        min_tracking_confidence=min_tracking_confidence
+    )
+
+
+def run_pose(pose, frame_rgb, timestamp_ms=None):
+    """Executa a inferência num frame RGB, entregando o timestamp (ms) do frame a quem o usa.
+
+    O PoseLandmarker suaviza os landmarks pelo timestamp do frame, e os
+    substitutos do Pose (recorte, pulo de frames, qualidade adaptativa) o repassam;
+    o Pose legado não o recebe.
+    """
+    if getattr(pose, "uses_timestamps", False):
+        return pose.process(frame_rgb, timestamp_ms)
+    return pose.process(frame_rgb)
+
+
+def landmarks_to_array(results):
+    """Converte o resultado do Pose em um array (33, 4) com x, y, z e visibilidade normalizados."""
+    if not results.pose_landmarks:
+        return None
+    # Resultados vindos de um array (cache, previsão) já o trazem pronto
+    array = getattr(results, "array", None)
+    if array is not None:
+        return array
+    return np.array(
+        [(landmark.x, landmark.y, landmark.z, landmark.visibility) for landmark in results.pose_landmarks.landmark],
+        dtype=np.float32
+    )
+
+
+def landmarks_to_pixels(results, width, height, indexes=None):
+    """Converte o resultado do Pose em um array (33, 4) em pixels, ou None sem detecção.
+
+    Colunas: x e y na imagem, z na escala de x e visibilidade. O array é
+    calculado uma vez por frame e compartilhado por todas as análises, que o
+    indexam pelo valor de PoseLandmark. Com `indexes`, só esses landmarks são
+    convertidos (os que as análises ativas usam) e as demais linhas ficam NaN.
+    """
+    scale = np.array((width, height, width, 1), dtype=np.float32)
+    if indexes is None:
+        array = landmarks_to_array(results)
+        return None if array is None else array * scale
+    if not results.pose_landmarks:
+        return None
+    pixels = np.full((NUM_LANDMARKS, 4), np.nan, dtype=np.float32)
+    if not indexes:
+        return pixels
+    array = getattr(results, "array", None)
+    if array is not None:
+        pixels[indexes] = array[indexes] * scale
+    else:
+        # Escala aplicada na leitura de cada landmark, sem array intermediário
+        landmark_list = results.pose_landmarks.landmark
+        pixels[indexes] = [
+            (landmark.x * width, landmark.y * height, landmark.z * width, landmark.visibility)
+            for landmark in map(landmark_list.__getitem__, indexes)
+        ]
+    return pixels
+
+
+class Landmark:
+    __slots__ = ("x", "y", "z", "visibility")
+
+    def __init__(self, x, y, z, visibility):
+        self.x = x
+        self.y = y
+        self.z = z
+        self.visibility = visibility
+
+
+class PoseLandmarks:
+    def __init__(self, landmark):
+        self.landmark = landmark
+
+
+class ArrayResults:
+    """Adapta um array (33, 4) para a interface `results.pose_landmarks.landmark` lida pelas análises."""
+
+    def __init__(self, array):
+        self.array = array
+        if array is None or np.isnan(array[0, 0]):
+            self.pose_landmarks = None
+        else:
+            self.pose_landmarks = PoseLandmarks([Landmark(*row) for row in array.tolist()])
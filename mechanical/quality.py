@@ -0,0 +1,137 @@
+"""Controle adaptativo de qualidade da inferência para manter um orçamento de latência.
+
+O QualityController mede o tempo de cada `pose.process` e alterna entre níveis
+de qualidade (complexidade do modelo e escala da imagem de entrada). Para não
+oscilar entre níveis, só reduz a qualidade após vários frames acima do
+orçamento e só a aumenta após um período maior com folga.
+"""
+import time
+
+import cv2
+
+from pose import run_pose
+
+# Níveis do mais leve ao mais pesado: (model_complexity, escala da imagem)
+QUALITY_LEVELS = [
+    (0, 0.5),
+    (0, 0.75),
+    (1, 0.75),
+    (1, 1.0),
+    (2, 1.0),
+]
+
+
+class QualityController:
+    def __init__(self, budget_ms, levels=QUALITY_LEVELS, smoothing=0.2,
+                 downgrade_after=10, upgrade_after=60, upgrade_margin=0.6):
+        self.budget_ms = budget_ms
+        self.levels = levels
+        self.smoothing = smoothing
+        self.downgrade_after = downgrade_after
+        self.upgrade_after = upgrade_after
+        self.upgrade_margin = upgrade_margin
+        self.level = len(levels) - 1
+        self.reset_measurements()
+
+    def reset_measurements(self):
+        self.average_ms = None
+        self.frames_over = 0
+        self.frames_under = 0
+
+    @property
+    def model_complexity(self):
+        return self.levels[self.level][0]
+
+    @property
+    def scale(self):
+        return self.levels[self.level][1]
+
+    def record(self, elapsed_ms):
+        """Registra o tempo de uma inferência e retorna True se o nível mudou."""
+        if self.average_ms is None:
+            self.average_ms = elapsed_ms
+        else:
+            self.average_ms += self.smoothing * (elapsed_ms - self.average_ms)
+
+        if self.average_ms > self.budget_ms:
+            self.frames_over += 1
+            self.frames_under = 0
+        elif self.average_ms < self.budget_ms * self.upgrade_margin:
+            self.frames_under += 1
+            self.frames_over = 0
+        else:
+            self.frames_over = 0
+            self.frames_under = 0
+
+        if self.frames_over >= self.downgrade_after and self.level > 0:
+            self.level -= 1
+        elif self.frames_under >= self.upgrade_after and self.level < len(self.levels) - 1:
+            self.level += 1
+        else:
+            return False
+
+        # As medições do nível anterior não valem para o novo
+        self.reset_measurements()
+        return True
+
+    def status_text(self):
+        average = f"{self.average_ms:.0f}" if self.average_ms is not None else "-"
+        return (f"Qualidade {self.level + 1}/{len(self.levels)}: complexidade {self.model_complexity}, "
+                f"{self.scale:.0%} ({average}/{self.budget_ms:.0f} ms)")
+
+
+class AdaptivePose:
+    """Substituto do Pose que ajusta complexidade e resolução conforme o QualityController.
+
+    Os landmarks são normalizados (0 a 1), então reduzir a imagem de entrada não
+    exige nenhuma conversão de coordenadas nas análises. `pose_factory` recebe a
+    complexidade do nível (0, 1 ou 2) e cria o Pose correspondente.
+
+    Com um Pose assíncrono (PoseLandmarker em LIVE_STREAM), `process` retorna
+    sem esperar pela inferência: o controlador recebe então as latências
+    medidas até o callback de cada frame, e não o tempo da chamada.
+    """
+
+    def __init__(self, controller, pose_factory):
+        self.controller = controller
+        self.pose_factory = pose_factory
+        self.pose = self.create_pose()
+        self.uses_timestamps = True
+
+    def create_pose(self):
+        return self.pose_factory(self.controller.model_complexity)
+
+    @property
+    def asynchronous(self):
+        return getattr(self.pose, "asynchronous", False)
+
+    def process(self, frame_rgb, timestamp_ms=None):
+        scale = self.controller.scale
+        if scale < 1.0:
+            frame_rgb = cv2.resize(frame_rgb, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+        start = time.perf_counter()
+        results = run_pose(self.pose, frame_rgb, timestamp_ms)
+        if self.asynchronous:
+            latencies = self.pose.pop_latencies()
+        else:
+            latencies = [(time.perf_counter() - start) * 1000]
+
+        complexity = self.controller.model_complexity
+        # Depois de uma troca de nível, as medições restantes são do nível anterior
+        changed = any(self.controller.record(elapsed_ms) for elapsed_ms in latencies)
+        if changed and self.controller.model_complexity != complexity:
+            self.pose.close()
+            self.pose = self.create_pose()
+        return results
+
+    def reset(self):
+        self.pose.reset()
+
+    def close(self):
+        self.pose.close()
+
+    def draw_overlay(self, annotated_frame):
+        """Escreve o nível de qualidade atual no canto inferior do frame."""
+        cv2.putText(annotated_frame, self.controller.status_text(), (10, annotated_frame.shape[0] - 15),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
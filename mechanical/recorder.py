@@ -0,0 +1,136 @@
+"""Gravação do vídeo anotado da sessão, sem atrasar a análise.
+
+A cada frame, `write` apenas copia o frame anotado (reduzido à resolução da
+gravação, se for outra) para um buffer livre e o entrega a uma thread, que o
+codifica com o cv2.VideoWriter (o OpenCV libera o GIL durante a codificação).
+Os buffers são reaproveitados e limitados: quando todos estão ocupados porque
+o codificador atrasou, o frame não é gravado e é contado em `dropped`, em vez
+de o loop de frames esperar.
+"""
+import os
+import queue
+import threading
+
+import cv2
+import numpy as np
+
+DEFAULT_RECORDING_DIR = os.path.join(os.path.expanduser("~"), "analisador-mecanica-corrida", "gravacoes")
+
+# Codecs oferecidos (FOURCC) e a extensão do arquivo de cada um
+RECORDING_CODECS = {"mp4v": ".mp4", "MJPG": ".avi", "XVID": ".avi"}
+
+# Resoluções da gravação: None mantém a do vídeo
+RECORDING_SIZES = (None, (1280, 720), (960, 540), (640, 360))
+
+# Maior intervalo sem frames preenchido com o frame anterior, em segundos
+MAX_GAP_S = 2
+
+# Marca o fim da gravação na fila do codificador
+END_OF_RECORDING = object()
+
+
+def recording_path(directory, name, codec):
+    """Caminho do arquivo de gravação, com a extensão adequada ao codec."""
+    return os.path.join(directory, name + RECORDING_CODECS.get(codec, ".avi"))
+
+
+class SessionRecorder:
+    """Grava os frames anotados num arquivo de vídeo, numa thread à parte.
+
+    O vídeo tem `fps` quadros por segundo e segue os timestamps dos frames:
+    quando a análise pula frames (câmera ao vivo), o frame anterior é repetido
+    para que a gravação mantenha o tempo real, e frames que chegam antes da sua
+    vez são ignorados. `size` é (largura, altura) ou None para a resolução do vídeo.
+    """
+
+    def __init__(self, path, fps, size=None, codec="mp4v", max_pending_frames=8):
+        self.path = path
+        self.fps = fps if fps and fps > 0 else 30.0
+        self.size = size
+        self.codec = codec
+        self.max_pending_frames = max_pending_frames
+
+        self.writer = None
+        self.first_timestamp_ms = None
+        self.written = 0
+        self.dropped = 0
+        self.error = None
+
+        # Buffers livres e frames à espera do codificador; juntos, nunca passam de max_pending_frames
+        self.free = queue.SimpleQueue()
+        self.pending = queue.SimpleQueue()
+        self.allocated = 0
+        self.thread = threading.Thread(target=self.encode_loop, name="gravacao", daemon=True)
+        self.thread.start()
+
+    def write(self, frame, timestamp_ms=None):
+        """Enfileira uma cópia do frame; retorna False se ele foi descartado."""
+        try:
+            buffer = self.free.get_nowait()
+        except queue.Empty:
+            if self.allocated == self.max_pending_frames:
+                # Codificador atrasado: o frame é descartado, o loop de frames segue
+                self.dropped += 1
+                return False
+            self.allocated += 1
+            buffer = None
+        self.pending.put((self.copy(frame, buffer), timestamp_ms))
+        return True
+
+    def copy(self, frame, buffer):
+        """Copia o frame para o buffer, reduzindo-o na mesma passada quando a resolução é outra."""
+        height, width = frame.shape[:2]
+        size = self.size or (width, height)
+        if buffer is not None and buffer.shape != (size[1], size[0], frame.shape[2]):
+            buffer = None
+        if size != (width, height):
+            return cv2.resize(frame, size, dst=buffer, interpolation=cv2.INTER_LINEAR)
+        if buffer is None:
+            return frame.copy()
+        np.copyto(buffer, frame)
+        return buffer
+
+    def encode_loop(self):
+        while True:
+            item = self.pending.get()
+            if item is END_OF_RECORDING:
+                return
+            image, timestamp_ms = item
+            if self.error is None:
+                try:
+                    self.encode(image, timestamp_ms)
+                except (cv2.error, OSError) as error:
+                    # Os frames seguintes são descartados, mas os buffers continuam voltando
+                    self.error = error
+                    print(f"Erro ao gravar o vídeo em {self.path}: {error}")
+            self.free.put(image)
+
+    def encode(self, image, timestamp_ms):
+        if self.writer is None:
+            height, width = image.shape[:2]
+            self.writer = cv2.VideoWriter(self.path, cv2.VideoWriter_fourcc(*self.codec), self.fps, (width, height))
+            if not self.writer.isOpened():
+                raise OSError(f"codec {self.codec} indisponível")
+            self.first_timestamp_ms = timestamp_ms
+
+        repeats = 1
+        if timestamp_ms is not None:
+            # Posição do frame no vídeo gravado, pelo seu timestamp
+            index = round((timestamp_ms - self.first_timestamp_ms) * self.fps / 1000)
+            repeats = index - self.written + 1
+            if repeats > MAX_GAP_S * self.fps:
+                # Pausa longa (ex.: câmera travada): a gravação continua daqui, sem preenchê-la
+                self.first_timestamp_ms = timestamp_ms - self.written * 1000 / self.fps
+                repeats = 1
+        for _ in range(repeats):
+            self.writer.write(image)
+        self.written += max(repeats, 0)
+
+    def close(self):
+        """Aguarda os frames pendentes e fecha o arquivo."""
+        self.pending.put(END_OF_RECORDING)
+        self.thread.join()
+        if self.writer is not None:
+            self.writer.release()
+        if self.dropped:
+            print(f"Gravação: {self.dropped} frames descartados porque a codificação atrasou")
@@ -0,0 +1,63 @@
+"""Atualização dos painéis das análises numa taxa própria, independente da inferência.
+
+As análises apenas marcam `dirty = True` em `process_frame`; o RefreshScheduler
+chama `update_ui()` das análises marcadas a cada tick do seu timer.
+"""
+from PyQt5.QtCore import QTimer
+
+DEFAULT_REFRESH_HZ = 15
+
+
+class RefreshScheduler:
+    def __init__(self, rate_hz=DEFAULT_REFRESH_HZ):
+        self.rate_hz = rate_hz
+        self.analyses = []
+        self.timer = QTimer()
+        self.timer.timeout.connect(self.refresh)
+
+    def start(self, analyses):
+        self.analyses = list(analyses)
+        self.timer.start(int(1000 / self.rate_hz))
+
+    def stop(self):
+        self.timer.stop()
+        self.analyses = []
+
+    def set_rate(self, rate_hz):
+        self.rate_hz = rate_hz
+        if self.timer.isActive():
+            self.timer.setInterval(int(1000 / rate_hz))
+
+    def refresh(self):
+        """Redesenha apenas os painéis cujas análises mudaram desde o último tick."""
+        for analysis in self.analyses:
+            if analysis.dirty:
+                analysis.dirty = False
+                analysis.update_ui()
+
+
+def configure_fast_plot(plot_widget, x_range=None, y_range=None):
+    """Aplica configurações baratas de desenho a um PlotWidget do pyqtgraph.
+
+    Reduz os pontos desenhados à resolução da tela, ignora o que está fora da
+    área visível e troca o autoajuste dos eixos (recalculado a cada setData) por
+    faixas fixas.
+    """
+    plot_item = plot_widget.getPlotItem()
+    plot_item.setDownsampling(auto=True, mode='peak')
+    plot_item.setClipToView(True)
+    plot_item.disableAutoRange()
+    if x_range is not None:
+        plot_item.setXRange(*x_range, padding=0)
+    if y_range is not None:
+        plot_item.setYRange(*y_range, padding=0)
+
+
+def expand_y_range(plot_widget, low, high, margin=0.2):
+    """Amplia a faixa do eixo Y apenas quando os dados saem dela."""
+    view_box = plot_widget.getPlotItem().getViewBox()
+    (_, _), (current_low, current_high) = view_box.viewRange()
+    if low >= current_low and high <= current_high:
+        return
+    span = max(high - low, 1.0)
+    view_box.setYRange(min(low, current_low) - span * margin, max(high, current_high) + span * margin, padding=0)
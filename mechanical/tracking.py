@@ -0,0 +1,190 @@
+"""Rastreamento do atleta entre frames para reduzir o custo da inferência."""
+import cv2
+import numpy as np
+
+from pose import ArrayResults, landmarks_to_array, run_pose
+
+
+class RoiPose:
+    """Substituto do Pose que recorta a entrada em torno dos landmarks do frame anterior.
+
+    O recorte é uma caixa com margem ao redor do corpo detectado. Os landmarks
+    do recorte são convertidos de volta para coordenadas normalizadas do frame
+    inteiro antes de chegarem às análises. Sem detecção, o próximo frame é
+    processado inteiro. Para não atrapalhar o rastreamento interno do Mediapipe,
+    o recorte só muda quando o corpo se aproxima da borda ou fica bem menor que ele.
+    """
+
+    def __init__(self, pose, padding=0.25, min_visibility=0.5, shrink_ratio=2.0):
+        self.pose = pose
+        self.padding = padding
+        self.min_visibility = min_visibility
+        self.shrink_ratio = shrink_ratio
+        self.roi = None  # (x0, y0, x1, y1) em pixels do frame inteiro
+        self.uses_timestamps = True
+
+    def process(self, frame_rgb, timestamp_ms=None):
+        height, width = frame_rgb.shape[:2]
+        if self.roi is None:
+            results = run_pose(self.pose, frame_rgb, timestamp_ms)
+        else:
+            x0, y0, x1, y1 = self.roi
+            crop = np.ascontiguousarray(frame_rgb[y0:y1, x0:x1])
+            results = run_pose(self.pose, crop, timestamp_ms)
+            if results.pose_landmarks:
+                self.to_frame_coordinates(results, x0, y0, x1 - x0, y1 - y0, width, height)
+
+        self.update_roi(results, width, height)
+        return results
+
+    def to_frame_coordinates(self, results, x0, y0, crop_width, crop_height, width, height):
+        """Converte, no lugar, landmarks normalizados no recorte para o frame inteiro."""
+        for landmark in results.pose_landmarks.landmark:
+            landmark.x = (landmark.x * crop_width + x0) / width
+            landmark.y = (landmark.y * crop_height + y0) / height
+            landmark.z = landmark.z * crop_width / width
+
+    def update_roi(self, results, width, height):
+        if not results.pose_landmarks:
+            self.roi = None
+            return
+
+        points = [(landmark.x, landmark.y) for landmark in results.pose_landmarks.landmark
+                  if landmark.visibility >= self.min_visibility]
+        if not points:
+            self.roi = None
+            return
+
+        xs, ys = zip(*points)
+        box_width = (max(xs) - min(xs)) * width
+        box_height = (max(ys) - min(ys)) * height
+        pad_x = box_width * self.padding
+        pad_y = box_height * self.padding
+        target = (
+            max(int(min(xs) * width - pad_x), 0),
+            max(int(min(ys) * height - pad_y), 0),
+            min(int(max(xs) * width + pad_x), width),
+            min(int(max(ys) * height + pad_y), height),
+        )
+        if target[2] - target[0] < 32 or target[3] - target[1] < 32:
+            self.roi = None
+            return
+
+        if self.roi is not None and self.contains(self.roi, target) \
+                and self.area(self.roi) < self.area(target) * self.shrink_ratio:
+            return
+        self.roi = target
+
+    @staticmethod
+    def contains(outer, inner):
+        return outer[0] <= inner[0] and outer[1] <= inner[1] and outer[2] >= inner[2] and outer[3] >= inner[3]
+
+    @staticmethod
+    def area(box):
+        return (box[2] - box[0]) * (box[3] - box[1])
+
+    def reset(self):
+        self.roi = None
+        self.pose.reset()
+
+    def close(self):
+        self.pose.close()
+
+    def draw_overlay(self, annotated_frame):
+        """Desenha o recorte usado na inferência."""
+        if self.roi is not None:
+            x0, y0, x1, y1 = self.roi
+            cv2.rectangle(annotated_frame, (x0, y0), (x1, y1), (255, 255, 0), 1)
+
+
+class SkippingPose:
+    """Substituto do Pose que roda a inferência só a cada `interval` frames.
+
+    Nos frames intermediários, cada landmark é extrapolado por um filtro de
+    velocidade constante ajustado nas inferências, então todo frame continua
+    chegando às análises com landmarks (importante para detectar o contato do pé
+    em câmeras de 120 a 240 fps). Se o movimento previsto entre dois frames
+    passar de `max_motion` (em coordenadas normalizadas), a inferência volta a
+    rodar em todo frame até o movimento diminuir.
+    """
+
+    def __init__(self, pose, interval=4, max_motion=0.02, smoothing=0.5, min_visibility=0.5):
+        self.pose = pose
+        self.interval = interval
+        self.max_motion = max_motion
+        self.smoothing = smoothing
+        self.min_visibility = min_visibility
+        self.uses_timestamps = True
+        self.reset_state()
+
+    def reset_state(self):
+        self.landmarks = None  # (33, 4) previsto para o frame atual
+        self.measured = None  # (33, 4) da última inferência
+        self.velocity = None  # (33, 3) por frame
+        self.frames_since_inference = 0
+        self.frames = 0
+        self.inferences = 0
+
+    def should_infer(self):
+        if self.landmarks is None or self.frames_since_inference + 1 >= self.interval:
+            return True
+        # Movimento rápido (ex.: pé no balanço): a previsão linear erra demais
+        return self.predicted_motion() > self.max_motion
+
+    def predicted_motion(self):
+        if self.velocity is None:
+            return 0.0
+        visible = self.measured[:, 3] >= self.min_visibility
+        if not visible.any():
+            return 0.0
+        return float(np.abs(self.velocity[visible, :2]).max())
+
+    def process(self, frame_rgb, timestamp_ms=None):
+        self.frames += 1
+        if self.should_infer():
+            results = run_pose(self.pose, frame_rgb, timestamp_ms)
+            self.inferences += 1
+            self.correct(landmarks_to_array(results))
+            return results
+
+        self.frames_since_inference += 1
+        if self.velocity is not None:
+            self.landmarks[:, :3] += self.velocity
+        # Cópia: o resultado pode ser lido em outra thread enquanto a previsão avança
+        return ArrayResults(self.landmarks.copy())
+
+    def correct(self, measured):
+        """Ajusta a velocidade de cada landmark com a nova inferência."""
+        if measured is None:
+            # Sem detecção não há o que extrapolar; infere de novo no próximo frame
+            self.landmarks = None
+            self.measured = None
+            self.velocity = None
+            self.frames_since_inference = 0
+            return
+
+        if self.measured is not None:
+            velocity = (measured[:, :3] - self.measured[:, :3]) / (self.frames_since_inference + 1)
+            if self.velocity is None:
+                self.velocity = velocity
+            else:
+                self.velocity += self.smoothing * (velocity - self.velocity)
+        self.measured = measured
+        self.landmarks = measured.copy()
+        self.frames_since_inference = 0
+
+    @property
+    def inference_ratio(self):
+        return self.inferences / self.frames if self.frames else 0.0
+
+    def reset(self):
+        self.reset_state()
+        self.pose.reset()
+
+    def close(self):
+        self.pose.close()
+
+    def draw_overlay(self, annotated_frame):
+        """Escreve a fração de frames que passaram pela inferência."""
+        cv2.putText(annotated_frame, f"Inferência em {self.inference_ratio:.0%} dos frames",
+                    (10, annotated_frame.shape[0] - 40), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
@@ -8,3 +8,73 @@ def calculate_angle(point_x, point_y, zero_line_x, reference_y):
     angle_deg = np.degrees(angle_rad)
 
     return angle_deg
+
+
+class RunningStats:
+    """Acumula média, desvio padrão, mínimo e máximo de uma série sem guardar os valores."""
+
+    def __init__(self):
+        self.reset()
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.total_sq += value * value
+        self.minimum = value if self.minimum is None else min(self.minimum, value)
+        self.maximum = value if self.maximum is None else max(self.maximum, value)
+
+    def reset(self):
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.minimum = None
+        self.maximum = None
+
+    def summary(self):
+        """Retorna as estatísticas acumuladas como dicionário."""
+        if self.count == 0:
+            return {"count": 0, "mean": None, "std": None, "min": None, "max": None}
+        mean = self.total / self.count
+        variance = max(self.total_sq / self.count - mean * mean, 0.0)
+        return {
+            "count": self.count,
+            "mean": float(mean),
+            "std": float(np.sqrt(variance)),
+            "min": float(self.minimum),
+            "max": float(self.maximum),
+        }
+
+
+class RingBuffer:
+    """Buffer circular pré-alocado para várias séries temporais em um único bloco 2-D.
+
+    Cada amostra é gravada duas vezes (na posição i e em i + capacity), de modo que
+    a janela mais recente é sempre uma fatia contígua: `view()` não copia dados e
+    `append()` custa O(1), independentemente da capacidade.
+    """
+
+    def __init__(self, capacity, n_series, dtype=np.float64):
+        self.capacity = capacity
+        self.data = np.zeros((n_series, 2 * capacity), dtype=dtype)
+        self.index = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def append(self, values):
+        """Adiciona uma amostra (um valor por série)."""
+        self.data[:, self.index] = values
+        self.data[:, self.index + self.capacity] = values
+        self.index = (self.index + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def view(self):
+        """Retorna a janela atual (n_series, size), da amostra mais antiga à mais recente."""
+        if self.size < self.capacity:
+            return self.data[:, :self.size]
+        return self.data[:, self.index:self.index + self.capacity]
+
+    def clear(self):
+        self.index = 0
+        self.size = 0